@@ -3,8 +3,11 @@ AsyncRedisCacheManager - Redis-backed cache manager with async interface
 Thay thế GlobalCacheManager với Redis backend để hỗ trợ persistence và scaling
 """
 
+import asyncio
 import json
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.logger import setup_logging
 from app.core.utils.cache import async_get_redis
@@ -16,11 +19,64 @@ TAG = __name__
 
 
 class AsyncRedisCacheManager:
-    """Async Redis-backed cache manager"""
+    """Async Redis-backed cache manager
+
+    Reads go through a short-lived in-process L1 cache first so repeated lookups
+    (e.g. device status probes) do not each cost a Redis round-trip.
+    """
+
+    # In-process L1 cache TTL (seconds) and max number of entries
+    L1_TTL = 1.0
+    L1_MAX_SIZE = 10000
+    # Longer L1 TTLs for slow-changing data read on every prompt build
+    L1_TTL_BY_TYPE = {
+        CacheType.LOCATION: 300.0,
+        CacheType.WEATHER: 60.0,
+    }
 
     def __init__(self):
         self._logger = logger
-        self._stats = {"hits": 0, "misses": 0, "errors": 0}
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        # cache_key -> (expires_at, value)
+        self._l1: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # cache_key -> in-flight Redis GET shared by concurrent readers
+        self._inflight: Dict[str, "asyncio.Task[Optional[Any]]"] = {}
+        # Bumped on every write so a batched read can tell its results went stale
+        self._write_seq = 0
+
+    def _l1_get(self, cache_key: str) -> Optional[Any]:
+        """Return the L1 value for cache_key, or None if missing/expired"""
+        hit = self._l1.get(cache_key)
+        if hit is None:
+            return None
+        if hit[0] <= time.time():
+            del self._l1[cache_key]
+            return None
+        return hit[1]
+
+    def _l1_set(
+        self, cache_key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """Store value in L1 for ttl seconds, evicting the oldest entry when full"""
+        self._l1[cache_key] = (
+            time.time() + (self.L1_TTL if ttl is None else ttl),
+            value,
+        )
+        self._l1.move_to_end(cache_key)
+        if len(self._l1) > self.L1_MAX_SIZE:
+            self._l1.popitem(last=False)
+
+    def _l1_evict(self, prefix: str, contains: str = "") -> None:
+        """Drop L1 entries under prefix whose remaining key contains `contains`"""
+        stale_keys = [
+            k
+            for k in self._l1
+            if k.startswith(prefix) and contains in k[len(prefix) :]
+        ]
+        for cache_key in stale_keys:
+            del self._l1[cache_key]
 
     def _get_cache_key(
         self, cache_type: CacheType, key: str, namespace: str = ""
@@ -51,32 +107,127 @@ class AsyncRedisCacheManager:
         """
         cache_key = self._get_cache_key(cache_type, key, namespace)
 
+        value = self._l1_get(cache_key)
+        if value is not None:
+            self._hits += 1
+            return value
+
+        # Coalesce concurrent reads of the same key into a single Redis GET;
+        # shield so a cancelled caller does not cancel the shared fetch
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch(cache_key, self.L1_TTL_BY_TYPE.get(cache_type))
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda t: self._release_inflight(cache_key, t))
+        return await asyncio.shield(task)
+
+    def _release_inflight(self, cache_key: str, task: asyncio.Task) -> None:
+        """Forget a finished fetch unless a newer one already replaced it"""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+
+    async def _fetch(
+        self, cache_key: str, l1_ttl: Optional[float] = None
+    ) -> Optional[Any]:
+        """Read and deserialize cache_key from Redis, filling L1 on hit"""
         try:
             async for redis_client in async_get_redis():
                 cached_data = await redis_client.get(cache_key)
 
                 if cached_data is None:
-                    self._stats["misses"] += 1
+                    self._misses += 1
                     return None
 
                 # Deserialize JSON data
                 value = json.loads(cached_data.decode("utf-8"))
-                self._stats["hits"] += 1
+                self._hits += 1
+                # Skip L1 if a write superseded this fetch while it was in flight
+                if self._inflight.get(cache_key) is asyncio.current_task():
+                    self._l1_set(cache_key, value, l1_ttl)
 
-                self._logger.bind(tag=TAG).debug(f"Cache HIT: {cache_key}")
+                self._logger.bind(tag=TAG).opt(lazy=True).debug(
+                    "Cache HIT: {}", lambda: cache_key
+                )
                 return value
 
         except json.JSONDecodeError as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(
                 f"Failed to deserialize cache data for {cache_key}: {e}"
             )
             return None
         except Exception as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(f"Error getting cache {cache_key}: {e}")
             return None
 
+    async def mget(
+        self, items: List[Tuple[CacheType, str]], namespace: str = ""
+    ) -> List[Optional[Any]]:
+        """Get several values with a single Redis MGET round-trip
+
+        Parameters
+        ----------
+        items : List[Tuple[CacheType, str]]
+            (cache_type, key) pairs to read
+        namespace : str, optional
+            Namespace for key isolation, applied to every key
+
+        Returns
+        -------
+        List[Optional[Any]]
+            Cached values in the same order as items, None where not found
+        """
+        cache_keys = [
+            self._get_cache_key(cache_type, key, namespace)
+            for cache_type, key in items
+        ]
+        values: List[Optional[Any]] = [self._l1_get(k) for k in cache_keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        self._hits += len(cache_keys) - len(missing)
+        if not missing:
+            return values
+
+        write_seq = self._write_seq
+        try:
+            async for redis_client in async_get_redis():
+                raw_values = await redis_client.mget([cache_keys[i] for i in missing])
+                # Skip L1 if any write happened while the MGET was in flight
+                fill_l1 = self._write_seq == write_seq
+
+                for i, cached_data in zip(missing, raw_values):
+                    if cached_data is None:
+                        self._misses += 1
+                        continue
+                    try:
+                        value = json.loads(cached_data.decode("utf-8"))
+                    except json.JSONDecodeError as e:
+                        self._errors += 1
+                        self._logger.bind(tag=TAG).error(
+                            f"Failed to deserialize cache data for {cache_keys[i]}: {e}"
+                        )
+                        continue
+                    self._hits += 1
+                    values[i] = value
+                    if fill_l1:
+                        self._l1_set(
+                            cache_keys[i],
+                            value,
+                            self.L1_TTL_BY_TYPE.get(items[i][0]),
+                        )
+
+                self._logger.bind(tag=TAG).opt(lazy=True).debug(
+                    "Cache MGET: {}", lambda: cache_keys
+                )
+
+        except Exception as e:
+            self._errors += 1
+            self._logger.bind(tag=TAG).error(f"Error getting cache {cache_keys}: {e}")
+
+        return values
+
     async def set(
         self,
         cache_type: CacheType,
@@ -105,6 +256,9 @@ class AsyncRedisCacheManager:
 
         # Determine effective TTL
         effective_ttl = ttl if ttl is not None else config.ttl
+        self._write_seq += 1
+        self._l1.pop(cache_key, None)
+        self._inflight.pop(cache_key, None)
 
         try:
             # Serialize value to JSON
@@ -117,19 +271,61 @@ class AsyncRedisCacheManager:
                 if effective_ttl is not None:
                     await redis_client.expire(cache_key, int(effective_ttl))
 
-                self._logger.bind(tag=TAG).debug(
-                    f"Cache SET: {cache_key} (TTL: {effective_ttl}s)"
+                self._logger.bind(tag=TAG).opt(lazy=True).debug(
+                    "Cache SET: {} (TTL: {}s)",
+                    lambda: cache_key,
+                    lambda: effective_ttl,
                 )
 
         except (TypeError, ValueError) as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(
                 f"Failed to serialize value for {cache_key}: {e}"
             )
         except Exception as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(f"Error setting cache {cache_key}: {e}")
 
+    async def touch(
+        self, cache_type: CacheType, key: str, ttl: float, namespace: str = ""
+    ) -> bool:
+        """Extend the TTL of an existing key without rewriting its value
+
+        Parameters
+        ----------
+        cache_type : CacheType
+            Type of cache
+        key : str
+            Cache key
+        ttl : float
+            New time-to-live in seconds
+        namespace : str, optional
+            Namespace for key isolation
+
+        Returns
+        -------
+        bool
+            True if the key exists and its TTL was updated, False otherwise
+        """
+        cache_key = self._get_cache_key(cache_type, key, namespace)
+
+        try:
+            async for redis_client in async_get_redis():
+                refreshed = bool(await redis_client.expire(cache_key, int(ttl)))
+
+                self._logger.bind(tag=TAG).opt(lazy=True).debug(
+                    "Cache TOUCH: {} (TTL: {}s, refreshed: {})",
+                    lambda: cache_key,
+                    lambda: ttl,
+                    lambda: refreshed,
+                )
+                return refreshed
+
+        except Exception as e:
+            self._errors += 1
+            self._logger.bind(tag=TAG).error(f"Error touching cache {cache_key}: {e}")
+            return False
+
     async def delete(
         self, cache_type: CacheType, key: str, namespace: str = ""
     ) -> bool:
@@ -141,24 +337,31 @@ class AsyncRedisCacheManager:
             True if key was deleted, False if key didn't exist
         """
         cache_key = self._get_cache_key(cache_type, key, namespace)
+        self._write_seq += 1
+        self._l1.pop(cache_key, None)
+        self._inflight.pop(cache_key, None)
 
         try:
             async for redis_client in async_get_redis():
                 result = await redis_client.delete(cache_key)
 
-                self._logger.bind(tag=TAG).debug(
-                    f"Cache DELETE: {cache_key} (deleted: {result > 0})"
+                self._logger.bind(tag=TAG).opt(lazy=True).debug(
+                    "Cache DELETE: {} (deleted: {})",
+                    lambda: cache_key,
+                    lambda: result > 0,
                 )
                 return result > 0
 
         except Exception as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(f"Error deleting cache {cache_key}: {e}")
             return False
 
     async def clear(self, cache_type: CacheType, namespace: str = "") -> None:
         """Clear all keys for a cache type and namespace"""
         pattern = self._get_cache_key(cache_type, "*", namespace)
+        self._write_seq += 1
+        self._l1_evict(self._get_cache_key(cache_type, "", namespace))
 
         try:
             async for redis_client in async_get_redis():
@@ -182,7 +385,7 @@ class AsyncRedisCacheManager:
                 )
 
         except Exception as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(f"Error clearing cache {pattern}: {e}")
 
     async def invalidate_pattern(
@@ -196,6 +399,8 @@ class AsyncRedisCacheManager:
             Number of keys deleted
         """
         search_pattern = self._get_cache_key(cache_type, f"*{pattern}*", namespace)
+        self._write_seq += 1
+        self._l1_evict(self._get_cache_key(cache_type, "", namespace), pattern)
 
         try:
             async for redis_client in async_get_redis():
@@ -220,7 +425,7 @@ class AsyncRedisCacheManager:
                 return deleted_count
 
         except Exception as e:
-            self._stats["errors"] += 1
+            self._errors += 1
             self._logger.bind(tag=TAG).error(
                 f"Error invalidating pattern {search_pattern}: {e}"
             )
@@ -228,7 +433,7 @@ class AsyncRedisCacheManager:
 
     def get_stats(self) -> dict:
         """Get cache statistics"""
-        return self._stats.copy()
+        return {"hits": self._hits, "misses": self._misses, "errors": self._errors}
 
 
 # Global singleton instance
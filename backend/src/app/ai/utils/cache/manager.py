@@ -2,23 +2,31 @@
 Trình quản lý bộ nhớ đệm toàn cục
 """
 
+import heapq
+import math
 import time
 import threading
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List, Tuple
 from collections import OrderedDict
 from .strategies import CacheStrategy, CacheEntry
 from .config import CacheConfig, CacheType
 
 
 class GlobalCacheManager:
-    """Trình quản lý bộ nhớ đệm toàn cục"""
+    """Trình quản lý bộ nhớ đệm toàn cục
+
+    Các thao tác không gọi lồng nhau khi đang giữ khóa, nên dùng threading.Lock
+    (nhẹ hơn RLock) cho từng vùng nhớ đệm.
+    """
 
     def __init__(self):
         self._logger = None
         self._caches: Dict[str, Dict[str, CacheEntry]] = {}
         self._configs: Dict[str, CacheConfig] = {}
-        self._locks: Dict[str, threading.RLock] = {}
-        self._global_lock = threading.RLock()
+        self._locks: Dict[str, threading.Lock] = {}
+        # Min-heap (expires_at, key) cho từng vùng nhớ đệm, phục vụ dọn dẹp mục hết hạn
+        self._heaps: Dict[str, List[Tuple[float, str]]] = {}
+        self._global_lock = threading.Lock()
         self._last_cleanup = time.time()
         self._stats = {"hits": 0, "misses": 0, "evictions": 0, "cleanups": 0}
 
@@ -39,15 +47,21 @@ class GlobalCacheManager:
 
     def _get_or_create_cache(self, cache_name: str, config: CacheConfig) -> Dict[str, CacheEntry]:
         """Lấy hoặc tạo vùng nhớ đệm"""
+        cache = self._caches.get(cache_name)
+        if cache is not None:
+            return cache
+
         with self._global_lock:
             if cache_name not in self._caches:
+                self._configs[cache_name] = config
+                self._locks[cache_name] = threading.Lock()
+                self._heaps[cache_name] = []
+                # Gán vùng nhớ đệm sau cùng để luồng khác không thấy trạng thái dở dang
                 self._caches[cache_name] = (
                     OrderedDict()
                     if config.strategy in [CacheStrategy.LRU, CacheStrategy.TTL_LRU]
                     else {}
                 )
-                self._configs[cache_name] = config
-                self._locks[cache_name] = threading.RLock()
             return self._caches[cache_name]
 
     def set(
@@ -70,18 +84,20 @@ class GlobalCacheManager:
             # Tạo mục bộ nhớ đệm
             entry = CacheEntry(value=value, timestamp=time.time(), ttl=effective_ttl)
 
+            heap = self._heaps[cache_name]
+            if entry.expires_at != math.inf:
+                heapq.heappush(heap, (entry.expires_at, key))
+
             # Xử lý theo từng chiến lược
             if config.strategy in [CacheStrategy.LRU, CacheStrategy.TTL_LRU]:
-                # Chiến lược LRU: nếu đã tồn tại thì di chuyển xuống cuối
-                if key in cache:
-                    del cache[key]
                 cache[key] = entry
+                # Chiến lược LRU: nếu đã tồn tại thì di chuyển xuống cuối
+                cache.move_to_end(key)
 
                 # Kiểm tra giới hạn kích thước
                 if config.max_size and len(cache) > config.max_size:
                     # Gỡ bỏ mục cũ nhất
-                    oldest_key = next(iter(cache))
-                    del cache[oldest_key]
+                    cache.popitem(last=False)
                     self._stats["evictions"] += 1
 
             else:
@@ -94,6 +110,16 @@ class GlobalCacheManager:
                     del cache[victim_key]
                     self._stats["evictions"] += 1
 
+            # Ghi đè và loại bỏ để lại phần tử cũ trong heap; dựng lại khi chúng chiếm đa số
+            # để heap không phình vô hạn dù vùng nhớ đệm hiếm khi tới lượt dọn dẹp
+            if len(heap) > 2 * len(cache) + 64:
+                heap[:] = [
+                    (e.expires_at, k)
+                    for k, e in cache.items()
+                    if e.expires_at != math.inf
+                ]
+                heapq.heapify(heap)
+
         # Dọn dẹp mục hết hạn theo chu kỳ
         self._maybe_cleanup(cache_name)
 
@@ -126,8 +152,7 @@ class GlobalCacheManager:
 
             # Chiến lược LRU: di chuyển xuống cuối
             if config.strategy in [CacheStrategy.LRU, CacheStrategy.TTL_LRU]:
-                del cache[key]
-                cache[key] = entry
+                cache.move_to_end(key)
 
             self._stats["hits"] += 1
             return entry.value
@@ -156,9 +181,10 @@ class GlobalCacheManager:
 
         with self._locks[cache_name]:
             self._caches[cache_name].clear()
+            self._heaps[cache_name].clear()
 
     def invalidate_pattern(self, cache_type: CacheType, pattern: str, namespace: str = "") -> int:
-        """Vô hiệu các mục bộ nhớ đệm theo mẫu"""
+        """Vô hiệu các mục bộ nhớ đệm theo mẫu (khóa chứa chuỗi con pattern)"""
         cache_name = self._get_cache_name(cache_type, namespace)
 
         if cache_name not in self._caches:
@@ -181,13 +207,18 @@ class GlobalCacheManager:
             return 0
 
         cache = self._caches[cache_name]
+        heap = self._heaps[cache_name]
         deleted_count = 0
 
+        now = time.time()
         with self._locks[cache_name]:
-            expired_keys = [key for key, entry in cache.items() if entry.is_expired()]
-            for key in expired_keys:
-                del cache[key]
-                deleted_count += 1
+            while heap and heap[0][0] <= now:
+                expires_at, key = heapq.heappop(heap)
+                entry = cache.get(key)
+                # Bỏ qua phần tử cũ của khóa đã bị xóa hoặc ghi đè
+                if entry is not None and entry.expires_at == expires_at:
+                    del cache[key]
+                    deleted_count += 1
 
         return deleted_count
 
@@ -203,7 +234,11 @@ class GlobalCacheManager:
             deleted = self._cleanup_expired(cache_name)
             if deleted > 0:
                 self._stats["cleanups"] += 1
-                self.logger.debug(f"Dọn dẹp bộ nhớ đệm {cache_name}: đã xóa {deleted} mục hết hạn")
+                self.logger.opt(lazy=True).debug(
+                    "Dọn dẹp bộ nhớ đệm {}: đã xóa {} mục hết hạn",
+                    lambda: cache_name,
+                    lambda: deleted,
+                )
 
 
 # Tạo một thể hiện trình quản lý bộ nhớ đệm toàn cục
@@ -2,10 +2,11 @@
 Định nghĩa chiến lược và cấu trúc dữ liệu bộ nhớ đệm
 """
 
+import math
 import time
 from enum import Enum
 from typing import Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 class CacheStrategy(Enum):
@@ -17,7 +18,7 @@ class CacheStrategy(Enum):
     TTL_LRU = "ttl_lru"  # Chiến lược lai TTL + LRU
 
 
-@dataclass
+@dataclass(slots=True)
 class CacheEntry:
     """Cấu trúc dữ liệu mục bộ nhớ đệm"""
 
@@ -26,16 +27,18 @@ class CacheEntry:
     ttl: Optional[float] = None  # Thời gian sống (giây)
     access_count: int = 0
     last_access: float = None
+    expires_at: float = field(init=False)  # Thời điểm hết hạn tuyệt đối
 
     def __post_init__(self):
         if self.last_access is None:
             self.last_access = self.timestamp
+        self.expires_at = (
+            self.timestamp + self.ttl if self.ttl is not None else math.inf
+        )
 
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Kiểm tra đã hết hạn hay chưa"""
-        if self.ttl is None:
-            return False
-        return time.time() - self.timestamp > self.ttl
+        return (time.time() if now is None else now) > self.expires_at
 
     def touch(self):
         """Cập nhật thời điểm truy cập và bộ đếm"""
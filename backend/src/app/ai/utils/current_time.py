@@ -3,7 +3,8 @@ Mô-đun tiện ích thời gian
 Cung cấp chức năng lấy thời gian thống nhất
 """
 
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 WEEKDAY_MAP = {
     "Monday": "Thứ Hai",
@@ -15,27 +16,63 @@ WEEKDAY_MAP = {
     "Sunday": "Chủ Nhật",
 }
 
+# Tra theo datetime.weekday() (0 = Thứ Hai), tránh strftime("%A") + tra dict
+_WEEKDAY_VI = (
+    "Thứ Hai",
+    "Thứ Ba",
+    "Thứ Tư",
+    "Thứ Năm",
+    "Thứ Sáu",
+    "Thứ Bảy",
+    "Chủ Nhật",
+)
+
+# Bộ nhớ đệm theo phút: [chỉ số phút, "HH:MM"]
+_minute_cache = [-1, ""]
+# Bộ nhớ đệm theo ngày: [thời điểm hết ngày (timestamp), "YYYY-MM-DD", thứ]
+_day_cache = [0.0, "", ""]
+
+
+def _refresh_day(now: float) -> None:
+    """Tính lại ngày và thứ khi đã sang ngày mới (theo giờ địa phương)"""
+    dt = datetime.fromtimestamp(now)
+    next_day = datetime.combine(dt.date() + timedelta(days=1), datetime.min.time())
+    _day_cache[:] = [
+        next_day.timestamp(),
+        dt.strftime("%Y-%m-%d"),
+        _WEEKDAY_VI[dt.weekday()],
+    ]
+
 
 def get_current_time() -> str:
     """
     Lấy chuỗi thời gian hiện tại (định dạng: HH:MM)
     """
-    return datetime.now().strftime("%H:%M")
+    now = time.time()
+    minute = int(now // 60)
+    if minute != _minute_cache[0]:
+        _minute_cache[:] = [minute, datetime.fromtimestamp(now).strftime("%H:%M")]
+    return _minute_cache[1]
 
 
 def get_current_date() -> str:
     """
     Lấy chuỗi ngày hôm nay (định dạng: YYYY-MM-DD)
     """
-    return datetime.now().strftime("%Y-%m-%d")
+    now = time.time()
+    if now >= _day_cache[0]:
+        _refresh_day(now)
+    return _day_cache[1]
 
 
 def get_current_weekday() -> str:
     """
     Lấy hôm nay là thứ mấy
     """
-    now = datetime.now()
-    return WEEKDAY_MAP[now.strftime("%A")]
+    now = time.time()
+    if now >= _day_cache[0]:
+        _refresh_day(now)
+    return _day_cache[2]
 
 
 def get_current_time_info() -> tuple:
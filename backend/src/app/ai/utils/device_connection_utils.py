@@ -127,13 +127,17 @@ async def refresh_device_connection(device_id: str, ttl: int = 300) -> bool:
         >>>     print("Connection refreshed!")
     """
     try:
-        # Re-set value để refresh TTL
-        await async_cache_manager.set(
-            cache_type=CacheType.CONFIG,
-            key=f"device:{device_id}:status",
-            value="connected",
-            ttl=ttl,
+        # Chỉ gia hạn TTL nếu key đã tồn tại, tránh ghi lại giá trị không đổi
+        refreshed = await async_cache_manager.touch(
+            cache_type=CacheType.CONFIG, key=f"device:{device_id}:status", ttl=ttl
         )
+        if not refreshed:
+            await async_cache_manager.set(
+                cache_type=CacheType.CONFIG,
+                key=f"device:{device_id}:status",
+                value="connected",
+                ttl=ttl,
+            )
         logger.bind(tag=TAG).debug(f"🔄 Làm mới TTL cho device {device_id} ({ttl}s)")
         return True
     except Exception as e:
@@ -1,14 +1,36 @@
-import uuid
 import re
-from typing import List, Dict
+import secrets
+from typing import List, Dict, Optional
 from datetime import datetime
 
 from app.core.logger import get_logger
+from app.ai.utils.current_time import get_current_time
 
 logger = get_logger(__name__)
 
+_MEMORY_RE = re.compile(r"<memory>.*?</memory>", re.DOTALL)
+
+
+def _new_id() -> str:
+    """Sinh ID ngẫu nhiên 32 ký tự hex (nhanh hơn str(uuid.uuid4()))"""
+    return secrets.token_hex(16)
+
+
+def _make_tool_call(function_id: str, function_name: str, function_arguments: str):
+    """Tạo danh sách tool_calls (một phần tử) theo định dạng OpenAI"""
+    return [
+        {
+            "id": function_id,
+            "function": {"arguments": function_arguments, "name": function_name},
+            "type": "function",
+            "index": 0,
+        }
+    ]
+
 
 class Message:
+    __slots__ = ("uniq_id", "role", "content", "tool_calls", "tool_call_id")
+
     def __init__(
         self,
         role: str,
@@ -17,7 +39,7 @@ class Message:
         tool_calls=None,
         tool_call_id=None,
     ):
-        self.uniq_id = uniq_id if uniq_id is not None else str(uuid.uuid4())
+        self.uniq_id = uniq_id if uniq_id is not None else _new_id()
         self.role = role
         self.content = content
         self.tool_calls = tool_calls
@@ -45,19 +67,11 @@ class Message:
         """
         return cls(
             role="assistant",
-            tool_calls=[
-                {
-                    "id": function_id,
-                    "function": {
-                        "arguments": (
-                            "{}" if function_arguments == "" else function_arguments
-                        ),
-                        "name": function_name,
-                    },
-                    "type": "function",
-                    "index": 0,
-                }
-            ],
+            tool_calls=_make_tool_call(
+                function_id,
+                function_name,
+                "{}" if function_arguments == "" else function_arguments,
+            ),
             uniq_id=uniq_id,
         )
 
@@ -82,7 +96,7 @@ class Message:
         return cls(
             role="tool",
             tool_call_id=(
-                tool_call_id if tool_call_id is not None else str(uuid.uuid4())
+                tool_call_id if tool_call_id is not None else _new_id()
             ),
             content=content,
             uniq_id=uniq_id,
@@ -91,28 +105,54 @@ class Message:
 
 class Dialogue:
     def __init__(self):
-        self.dialogue: List[Message] = []
+        self._dialogue: List[Message] = []
+        # Tham chiếu trực tiếp tới thông điệp hệ thống, tránh quét lại cả đối thoại mỗi lượt
+        self._system_message: Optional[Message] = None
+        # Dạng dict đã tuần tự hóa của các thông điệp không phải hệ thống, tạo sẵn khi put
+        self._serialized: List[Dict] = []
         # Lấy thời gian hiện tại
         self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    @property
+    def dialogue(self) -> List[Message]:
+        return self._dialogue
+
+    @dialogue.setter
+    def dialogue(self, messages: List[Message]):
+        # Gán lại toàn bộ đối thoại (ví dụ lọc lịch sử) thì tính lại thông điệp hệ thống
+        self._dialogue = messages
+        self._system_message = next(
+            (msg for msg in messages if msg.role == "system"), None
+        )
+        self._serialized = [
+            self._serialize(msg) for msg in messages if msg.role != "system"
+        ]
+
     def put(self, message: Message):
-        self.dialogue.append(message)
+        self._dialogue.append(message)
+        if message.role == "system":
+            if self._system_message is None:
+                self._system_message = message
+        else:
+            self._serialized.append(self._serialize(message))
 
-    def getMessages(self, m, dialogue):
+    @staticmethod
+    def _serialize(m: Message) -> Dict:
+        """Chuyển một thông điệp sang dạng dict gửi cho LLM"""
         if m.tool_calls is not None:
-            dialogue.append({"role": m.role, "tool_calls": m.tool_calls})
-        elif m.role == "tool":
-            dialogue.append(
-                {
-                    "role": m.role,
-                    "tool_call_id": (
-                        str(uuid.uuid4()) if m.tool_call_id is None else m.tool_call_id
-                    ),
-                    "content": m.content,
-                }
-            )
-        else:
-            dialogue.append({"role": m.role, "content": m.content})
+            return {"role": m.role, "tool_calls": m.tool_calls}
+        if m.role == "tool":
+            return {
+                "role": m.role,
+                "tool_call_id": (
+                    _new_id() if m.tool_call_id is None else m.tool_call_id
+                ),
+                "content": m.content,
+            }
+        return {"role": m.role, "content": m.content}
+
+    def getMessages(self, m, dialogue):
+        dialogue.append(self._serialize(m))
 
     def get_llm_dialogue(self) -> List[Dict[str, str]]:
         # Gọi trực tiếp get_llm_dialogue_with_memory với None làm memory_str
@@ -121,8 +161,7 @@ class Dialogue:
 
     def update_system_message(self, new_content: str):
         """Cập nhật hoặc thêm thông điệp hệ thống"""
-        # Tìm thông điệp hệ thống đầu tiên
-        system_msg = next((msg for msg in self.dialogue if msg.role == "system"), None)
+        system_msg = self._system_message
         if system_msg:
             system_msg.content = new_content
         else:
@@ -131,67 +170,58 @@ class Dialogue:
     def get_llm_dialogue_with_memory(
         self, memory_str: str = None, voiceprint_config: dict = None
     ) -> List[Dict[str, str]]:
-        # Xây dựng đối thoại
-        dialogue = []
-
         # Thêm prompt hệ thống và trí nhớ
-        system_message = next(
-            (msg for msg in self.dialogue if msg.role == "system"), None
-        )
+        system_message = self._system_message
 
-        if system_message:
-            # Prompt hệ thống cơ bản
-            enhanced_system_prompt = system_message.content
+        if not system_message:
+            # Chỉ có hội thoại người dùng/trợ lý (đã tuần tự hóa sẵn khi put)
+            return self._serialized.copy()
 
-            # Thay thế placeholder thời gian
+        # Prompt hệ thống cơ bản
+        enhanced_system_prompt = system_message.content
+
+        # Thay thế placeholder thời gian (chỉ khi prompt có placeholder)
+        if "{{current_time}}" in enhanced_system_prompt:
             enhanced_system_prompt = enhanced_system_prompt.replace(
-                "{{current_time}}", datetime.now().strftime("%H:%M")
+                "{{current_time}}", get_current_time()
             )
 
-            # Thêm mô tả cá nhân hóa người nói
-            try:
-                speakers = (
-                    voiceprint_config.get("speakers", []) if voiceprint_config else []
-                )
-                if speakers:
-                    enhanced_system_prompt += "\n\n<speakers_info>"
-                    for speaker_str in speakers:
-                        try:
-                            parts = speaker_str.split(",", 2)
-                            if len(parts) >= 2:
-                                name = parts[1].strip()
-                                # Nếu mô tả rỗng thì đặt thành ""
-                                description = (
-                                    parts[2].strip() if len(parts) >= 3 else ""
-                                )
-                                enhanced_system_prompt += f"\n- {name}: {description}"
-                        except:
-                            pass
-                    enhanced_system_prompt += "\n\n</speakers_info>"
-            except:
-                # Bỏ qua lỗi nếu đọc cấu hình thất bại, tránh ảnh hưởng chức năng khác
-                pass
-
-            # Dùng regex để khớp thẻ <memory> bất kể nội dung bên trong
-            if memory_str is not None:
-                enhanced_system_prompt_before = enhanced_system_prompt
-                enhanced_system_prompt = re.sub(
-                    r"<memory>.*?</memory>",
-                    f"<memory>\n{memory_str}\n</memory>",
-                    enhanced_system_prompt,
-                    flags=re.DOTALL,
-                )
-
-                if enhanced_system_prompt_before != enhanced_system_prompt:
-                    # Cập nhật lại system_message.content để lưu memory vĩnh viễn
-                    system_message.content = enhanced_system_prompt
-                    logger.debug("Updated system message with new memory.")
-
-            dialogue.append({"role": "system", "content": enhanced_system_prompt})
-
-        # Thêm đoạn hội thoại của người dùng và trợ lý
-        for m in self.dialogue:
-            if m.role != "system":  # Bỏ qua thông điệp hệ thống gốc
-                self.getMessages(m, dialogue)
-
-        return dialogue
+        # Thêm mô tả cá nhân hóa người nói
+        # Cấu hình lỗi định dạng thì bỏ qua, tránh ảnh hưởng chức năng khác
+        speakers = (
+            voiceprint_config.get("speakers")
+            if isinstance(voiceprint_config, dict)
+            else None
+        )
+        if speakers and isinstance(speakers, (list, tuple)):
+            prompt_parts = [enhanced_system_prompt, "\n\n<speakers_info>"]
+            for speaker_str in speakers:
+                if not isinstance(speaker_str, str):
+                    continue
+                parts = speaker_str.split(",", 2)
+                if len(parts) >= 2:
+                    name = parts[1].strip()
+                    # Nếu mô tả rỗng thì đặt thành ""
+                    description = parts[2].strip() if len(parts) >= 3 else ""
+                    prompt_parts.append(f"\n- {name}: {description}")
+            prompt_parts.append("\n\n</speakers_info>")
+            enhanced_system_prompt = "".join(prompt_parts)
+
+        # Dùng regex để khớp thẻ <memory> bất kể nội dung bên trong
+        if memory_str is not None and "<memory>" in enhanced_system_prompt:
+            enhanced_system_prompt_before = enhanced_system_prompt
+            enhanced_system_prompt = _MEMORY_RE.sub(
+                f"<memory>\n{memory_str}\n</memory>",
+                enhanced_system_prompt,
+            )
+
+            if enhanced_system_prompt_before != enhanced_system_prompt:
+                # Cập nhật lại system_message.content để lưu memory vĩnh viễn
+                system_message.content = enhanced_system_prompt
+                logger.debug("Updated system message with new memory.")
+
+        # Ghép prompt hệ thống với hội thoại đã tuần tự hóa sẵn trong một lần cấp phát
+        return [
+            {"role": "system", "content": enhanced_system_prompt},
+            *self._serialized,
+        ]
@@ -4,12 +4,12 @@ Chuyển dữ liệu âm thanh PCM sang định dạng Opus
 """
 
 import traceback
-import numpy as np
-from opuslib_next import Encoder
-from opuslib_next import constants
-from typing import Optional, Callable, Any
+from typing import TYPE_CHECKING, Optional, Callable, Any
 from app.core.logger import get_logger
 
+if TYPE_CHECKING:
+    import numpy as np
+
 TAG = __name__
 logger = get_logger(TAG)
 
@@ -39,8 +39,13 @@ class OpusEncoderUtils:
         self.bitrate = 24000  # bps
         self.complexity = 10  # Chất lượng cao nhất
 
-        # Khởi tạo bộ đệm rỗng
-        self.buffer = np.array([], dtype=np.int16)
+        # Số byte của một khung PCM 16-bit
+        self.frame_bytes = self.total_frame_size * 2
+        # Bộ đệm PCM dạng byte (little-endian), cắt khung trực tiếp không qua numpy
+        self._pcm = bytearray()
+
+        # Import trễ: chỉ nạp libopus khi thực sự cần mã hóa âm thanh
+        from opuslib_next import Encoder, constants
 
         try:
             # Tạo bộ mã hóa Opus
@@ -57,7 +62,14 @@ class OpusEncoderUtils:
     def reset_state(self):
         """Đặt lại trạng thái bộ mã hóa"""
         self.encoder.reset_state()
-        self.buffer = np.array([], dtype=np.int16)
+        self._pcm.clear()
+
+    @property
+    def buffer(self) -> "np.ndarray":
+        """Các mẫu đang chờ mã hóa (bản sao dạng mảng short)"""
+        import numpy as np
+
+        return np.frombuffer(bytes(self._pcm), dtype=np.int16)
 
     def encode_pcm_to_opus_stream(self, pcm_data: bytes, end_of_stream: bool, callback: Callable[[Any], Any]):
         """
@@ -71,44 +83,46 @@ class OpusEncoderUtils:
         Returns:
             Danh sách gói dữ liệu Opus
         """
-        # Chuyển dữ liệu byte thành mảng short
-        new_samples = self._convert_bytes_to_shorts(pcm_data)
-
         # Kiểm tra dữ liệu PCM
-        self._validate_pcm_data(new_samples)
+        self._validate_pcm_data(pcm_data)
 
         # Thêm dữ liệu mới vào bộ đệm
-        self.buffer = np.append(self.buffer, new_samples)
-
-        offset = 0
-
-        # Xử lý tất cả các khung đầy đủ
-        while offset <= len(self.buffer) - self.total_frame_size:
-            frame = self.buffer[offset : offset + self.total_frame_size]
-            output = self._encode(frame)
-            if output:
-                callback(output)
-            offset += self.total_frame_size
-
-        # Giữ lại các mẫu chưa xử lý
-        self.buffer = self.buffer[offset:]
+        self._pcm += pcm_data
+
+        frame_bytes = self.frame_bytes
+        # Số byte thuộc các khung đầy đủ
+        full = len(self._pcm) - len(self._pcm) % frame_bytes
+
+        # Xử lý tất cả các khung đầy đủ: cắt toàn bộ khung trong một lượt,
+        # giải phóng view trước khi gọi callback rồi mới mã hóa từng khung
+        if full:
+            with memoryview(self._pcm) as view:
+                frames = [
+                    bytes(view[offset : offset + frame_bytes])
+                    for offset in range(0, full, frame_bytes)
+                ]
+            # Giữ lại các mẫu chưa xử lý (xóa đầu bytearray không phải chép lại toàn bộ)
+            del self._pcm[:full]
+
+            encode = self._encode
+            for frame in frames:
+                output = encode(frame)
+                if output:
+                    callback(output)
 
         # Khi luồng kết thúc thì xử lý phần dữ liệu còn lại
-        if end_of_stream and len(self.buffer) > 0:
+        if end_of_stream and len(self._pcm) > 0:
             # Tạo khung cuối và đệm bằng số 0
-            last_frame = np.zeros(self.total_frame_size, dtype=np.int16)
-            last_frame[: len(self.buffer)] = self.buffer
+            last_frame = bytes(self._pcm) + bytes(frame_bytes - len(self._pcm))
 
             output = self._encode(last_frame)
             if output:
                 callback(output)
-            self.buffer = np.array([], dtype=np.int16)
+            self._pcm.clear()
 
-    def _encode(self, frame: np.ndarray) -> Optional[bytes]:
+    def _encode(self, frame_bytes: bytes) -> Optional[bytes]:
         """Mã hóa một khung dữ liệu âm thanh"""
         try:
-            # Chuyển mảng numpy thành bytes
-            frame_bytes = frame.tobytes()
             # opuslib yêu cầu số byte đầu vào phải là bội số của channels*2
             encoded = self.encoder.encode(frame_bytes, self.frame_size)
             return encoded
@@ -117,19 +131,14 @@ class OpusEncoderUtils:
             traceback.print_exc()
             return None
 
-    def _convert_bytes_to_shorts(self, bytes_data: bytes) -> np.ndarray:
-        """Chuyển mảng byte thành mảng short (PCM 16-bit)"""
-        # Giả định đầu vào là PCM 16-bit little-endian
-        return np.frombuffer(bytes_data, dtype=np.int16)
-
-    def _validate_pcm_data(self, pcm_shorts: np.ndarray) -> None:
+    def _validate_pcm_data(self, pcm_data: bytes) -> None:
         """Xác minh dữ liệu PCM có hợp lệ hay không"""
-        # Dải PCM 16-bit là -32768 đến 32767
-        if np.any((pcm_shorts < -32768) | (pcm_shorts > 32767)):
-            invalid_samples = pcm_shorts[(pcm_shorts < -32768) | (pcm_shorts > 32767)]
-            logger.warning(f"Phát hiện mẫu PCM không hợp lệ: {invalid_samples[:5]}...")
-            # Thực tế có thể chọn cắt thay vì ném ngoại lệ
-            # np.clip(pcm_shorts, -32768, 32767, out=pcm_shorts)
+        # Mẫu int16 luôn nằm trong dải -32768..32767 nên không cần quét giá trị,
+        # chỉ cần đảm bảo dữ liệu là bội số của 2 byte để không lệch mẫu
+        if len(pcm_data) % 2:
+            raise ValueError(
+                f"Dữ liệu PCM 16-bit phải có số byte chẵn, nhận được {len(pcm_data)}"
+            )
 
     def close(self):
         """Đóng bộ mã hóa và giải phóng tài nguyên"""
@@ -1,10 +1,15 @@
 import datetime
-from typing import Dict, Tuple
+import threading
+from collections import defaultdict
+from typing import DefaultDict
 
-# Từ điển toàn cục dùng để lưu số ký tự xuất ra mỗi ngày của từng thiết bị
-_device_daily_output: Dict[Tuple[str, datetime.date], int] = {}
+# Từ điển toàn cục dùng để lưu số ký tự xuất ra trong ngày của từng thiết bị
+# (chỉ giữ số liệu của ngày _last_check_date nên khóa chỉ cần device_id)
+_device_daily_output: DefaultDict[str, int] = defaultdict(int)
 # Ghi nhận ngày kiểm tra gần nhất
 _last_check_date: datetime.date = None
+# Bảo vệ thao tác đổi ngày + cộng dồn khi nhiều luồng cùng ghi
+_lock = threading.Lock()
 
 
 def reset_device_output():
@@ -12,31 +17,34 @@ def reset_device_output():
     Đặt lại số ký tự xuất ra hằng ngày của tất cả thiết bị
     Gọi hàm này lúc 0 giờ hằng ngày
     """
-    _device_daily_output.clear()
+    with _lock:
+        _device_daily_output.clear()
 
 
 def get_device_output(device_id: str) -> int:
     """
     Lấy số ký tự thiết bị đã xuất ra trong ngày
     """
-    current_date = datetime.datetime.now().date()
-    return _device_daily_output.get((device_id, current_date), 0)
+    # Số liệu của ngày cũ không còn tính
+    if _last_check_date != datetime.date.today():
+        return 0
+    return _device_daily_output.get(device_id, 0)
 
 
 def add_device_output(device_id: str, char_count: int):
     """
     Tăng số ký tự xuất ra của thiết bị
     """
-    current_date = datetime.datetime.now().date()
+    current_date = datetime.date.today()
     global _last_check_date
 
-    # Nếu là lần gọi đầu tiên hoặc ngày thay đổi thì xóa bộ đếm
-    if _last_check_date is None or _last_check_date != current_date:
-        _device_daily_output.clear()
-        _last_check_date = current_date
+    with _lock:
+        # Nếu là lần gọi đầu tiên hoặc ngày thay đổi thì xóa bộ đếm
+        if _last_check_date != current_date:
+            _device_daily_output.clear()
+            _last_check_date = current_date
 
-    current_count = _device_daily_output.get((device_id, current_date), 0)
-    _device_daily_output[(device_id, current_date)] = current_count + char_count
+        _device_daily_output[device_id] += char_count
 
 
 def check_device_output_limit(device_id: str, max_output_size: int) -> bool:
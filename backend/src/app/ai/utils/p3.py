@@ -1,59 +1,60 @@
+import mmap
+import os
 import struct
 
+# Header mỗi gói p3 (4 byte): [1 byte loại, 1 byte dự phòng, 2 byte độ dài big-endian]
+_HEADER = struct.Struct('>BBH')
+
+
+def _parse_opus_packets(buf, source):
+    """
+    Tách các gói Opus từ bộ đệm p3 bằng một lần duyệt offset (không đọc từng phần nhỏ).
+    """
+    # Cắt trực tiếp trên bytes/mmap đã cho ra bytes với đúng một lần sao chép
+    if not isinstance(buf, (bytes, mmap.mmap)):
+        buf = bytes(buf)
+
+    opus_datas = []
+    header_size = _HEADER.size
+    total = len(buf)
+    offset = 0
+    while offset < total:
+        _, _, data_len = _HEADER.unpack_from(buf, offset)
+        offset += header_size
+        end = offset + data_len
+        if end > total:
+            raise ValueError(f"Data length({total - offset}) mismatch({data_len}) in the {source}.")
+        opus_datas.append(buf[offset:end])
+        offset = end
+    return opus_datas
+
+
 def decode_opus_from_file(input_file):
     """
     Giải mã dữ liệu Opus từ tệp p3 và trả về danh sách gói Opus cùng tổng thời lượng.
     """
-    opus_datas = []
-    total_frames = 0
-    sample_rate = 16000  # Tần số lấy mẫu của tệp
     frame_duration_ms = 60  # Độ dài khung
-    frame_size = int(sample_rate * frame_duration_ms / 1000)
 
     with open(input_file, 'rb') as f:
-        while True:
-            # Đọc header (4 byte): [1 byte loại, 1 byte dự phòng, 2 byte độ dài]
-            header = f.read(4)
-            if not header:
-                break
-
-            # Giải unpack thông tin header
-            _, _, data_len = struct.unpack('>BBH', header)
-
-            # Đọc dữ liệu Opus theo độ dài chỉ định trong header
-            opus_data = f.read(data_len)
-            if len(opus_data) != data_len:
-                raise ValueError(f"Data length({len(opus_data)}) mismatch({data_len}) in the file.")
-
-            opus_datas.append(opus_data)
-            total_frames += 1
+        # mmap không thể ánh xạ tệp rỗng
+        if os.fstat(f.fileno()).st_size == 0:
+            opus_datas = []
+        else:
+            # Ánh xạ tệp vào bộ nhớ, OS nạp trang theo nhu cầu thay vì đọc cả tệp vào bộ đệm
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                opus_datas = _parse_opus_packets(mm, "file")
 
     # Tính tổng thời lượng
-    total_duration = (total_frames * frame_duration_ms) / 1000.0
+    total_duration = (len(opus_datas) * frame_duration_ms) / 1000.0
     return opus_datas, total_duration
 
 def decode_opus_from_bytes(input_bytes):
     """
     Giải mã dữ liệu Opus từ dữ liệu nhị phân p3 và trả về danh sách gói cùng tổng thời lượng.
     """
-    import io
-    opus_datas = []
-    total_frames = 0
-    sample_rate = 16000  # Tần số lấy mẫu của tệp
     frame_duration_ms = 60  # Độ dài khung
-    frame_size = int(sample_rate * frame_duration_ms / 1000)
-
-    f = io.BytesIO(input_bytes)
-    while True:
-        header = f.read(4)
-        if not header:
-            break
-        _, _, data_len = struct.unpack('>BBH', header)
-        opus_data = f.read(data_len)
-        if len(opus_data) != data_len:
-            raise ValueError(f"Data length({len(opus_data)}) mismatch({data_len}) in the bytes.")
-        opus_datas.append(opus_data)
-        total_frames += 1
-
-    total_duration = (total_frames * frame_duration_ms) / 1000.0
+
+    opus_datas = _parse_opus_packets(input_bytes, "bytes")
+
+    total_duration = (len(opus_datas) * frame_duration_ms) / 1000.0
     return opus_datas, total_duration
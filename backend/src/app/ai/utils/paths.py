@@ -3,12 +3,15 @@ Path Utilities - Lấy các đường dẫn cố định trong ứng dụng
 Tất cả các đường dẫn được tính toán từ app root để tránh hard-code
 
 Tổng hợp tất cả các path utility thay vì dùng Path(__file__).resolve().parents[n]
+Các accessor không tham số được cache: đường dẫn chỉ tính (và mkdir) một lần mỗi tiến trình
 """
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Union
 
 
+@lru_cache(maxsize=None)
 def get_app_root() -> Path:
     """
     Lấy thư mục gốc của ứng dụng (main/fastapi-server-v2/app)
@@ -19,6 +22,7 @@ def get_app_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
+@lru_cache(maxsize=None)
 def get_project_root() -> Path:
     """
     Lấy thư mục gốc của project (main/fastapi-server-v2)
@@ -29,6 +33,7 @@ def get_project_root() -> Path:
     return Path(__file__).resolve().parents[3]
 
 
+@lru_cache(maxsize=None)
 def get_config_dir() -> Path:
     """
     Lấy thư mục config (app/config)
@@ -39,6 +44,7 @@ def get_config_dir() -> Path:
     return get_app_root() / "config"
 
 
+@lru_cache(maxsize=None)
 def get_data_dir() -> Path:
     """
     Lấy thư mục data (app/data)
@@ -49,6 +55,7 @@ def get_data_dir() -> Path:
     return get_app_root() / "data"
 
 
+@lru_cache(maxsize=None)
 def get_ai_dir() -> Path:
     """
     Lấy thư mục AI (app/ai)
@@ -59,6 +66,7 @@ def get_ai_dir() -> Path:
     return get_app_root() / "ai"
 
 
+@lru_cache(maxsize=None)
 def get_ai_config_dir() -> Path:
     """
     Lấy thư mục config của AI (app/ai/config)
@@ -69,6 +77,7 @@ def get_ai_config_dir() -> Path:
     return get_ai_dir() / "config"
 
 
+@lru_cache(maxsize=None)
 def get_base_config_file() -> Path:
     """
     Lấy đường dẫn file base config (app/ai/config/config.yml)
@@ -80,6 +89,7 @@ def get_base_config_file() -> Path:
     return get_ai_config_dir() / "config.yml"
 
 
+@lru_cache(maxsize=None)
 def get_assets_dir() -> Path:
     """
     Lấy thư mục assets (app/config/assets)
@@ -90,6 +100,7 @@ def get_assets_dir() -> Path:
     return get_config_dir() / "assets"
 
 
+@lru_cache(maxsize=None)
 def get_models_data_dir() -> Path:
     """
     Lấy thư mục models_data (src/app/data/model)
@@ -102,6 +113,7 @@ def get_models_data_dir() -> Path:
     return models_dir
 
 
+@lru_cache(maxsize=None)
 def get_vad_models_dir() -> Path:
     """
     Lấy thư mục VAD models (src/app/ai/model)
@@ -114,6 +126,7 @@ def get_vad_models_dir() -> Path:
     return models_dir
 
 
+@lru_cache(maxsize=None)
 def get_wakeup_words_dir() -> Path:
     """
     Lấy thư mục wakeup words (app/config/assets/wakeup_words)
@@ -124,6 +137,7 @@ def get_wakeup_words_dir() -> Path:
     return get_assets_dir() / "wakeup_words"
 
 
+@lru_cache(maxsize=None)
 def get_wakeup_words_config_file() -> Path:
     """
     Lấy đường dẫn file cấu hình wakeup words (app/data/.wakeup_words.yaml)
@@ -134,6 +148,7 @@ def get_wakeup_words_config_file() -> Path:
     return get_data_dir() / ".wakeup_words.yaml"
 
 
+@lru_cache(maxsize=None)
 def get_music_dir() -> Path:
     """
     Lấy thư mục music (app/music)
@@ -144,6 +159,7 @@ def get_music_dir() -> Path:
     return get_app_root() / "music"
 
 
+@lru_cache(maxsize=None)
 def get_performance_tester_dir() -> Path:
     """
     Lấy thư mục performance_tester (app/performance_tester)
@@ -154,6 +170,7 @@ def get_performance_tester_dir() -> Path:
     return get_app_root() / "performance_tester"
 
 
+@lru_cache(maxsize=None)
 def get_plugins_func_dir() -> Path:
     """
     Lấy thư mục plugins_func (app/plugins_func)
@@ -164,6 +181,7 @@ def get_plugins_func_dir() -> Path:
     return get_ai_dir() / "plugins_func"
 
 
+@lru_cache(maxsize=None)
 def get_tmp_dir() -> Path:
     """
     Lấy thư mục tmp (app/tmp)
@@ -174,6 +192,7 @@ def get_tmp_dir() -> Path:
     return get_app_root() / "tmp"
 
 
+@lru_cache(maxsize=None)
 def get_wakeup_words_short_audio() -> Path:
     """
     Lấy đường dẫn file audio short wakeup (app/config/assets/wakeup_words_short.wav)
@@ -184,6 +203,7 @@ def get_wakeup_words_short_audio() -> Path:
     return get_assets_dir() / "wakeup_words_short.wav"
 
 
+@lru_cache(maxsize=None)
 def get_agent_base_prompt_file() -> Path:
     """
     Lấy đường dẫn file prompt cơ bản (app/ai/agent-base-prompt.txt)
@@ -195,6 +215,7 @@ def get_agent_base_prompt_file() -> Path:
     return get_ai_dir() / "agent-base-prompt.txt"
 
 
+@lru_cache(maxsize=None)
 def get_mcp_server_settings_file() -> Path:
     """
     Lấy đường dẫn file cấu hình MCP server (app/data/mcp_server_settings.json)
@@ -205,6 +226,7 @@ def get_mcp_server_settings_file() -> Path:
     return get_data_dir() / "mcp_server_settings.json"
 
 
+@lru_cache(maxsize=None)
 def get_config_file() -> Path:
     """
     Lấy đường dẫn file config mặc định (app/data/.config.yml)
@@ -215,6 +237,7 @@ def get_config_file() -> Path:
     return get_data_dir() / ".config.yml"
 
 
+@lru_cache(maxsize=None)
 def get_src_dir() -> Path:
     """
     Lấy thư mục src (src)
@@ -225,6 +248,7 @@ def get_src_dir() -> Path:
     return get_project_root() / "src"
 
 
+@lru_cache(maxsize=None)
 def get_logs_dir() -> Path:
     """
     Lấy thư mục logs (src/logs)
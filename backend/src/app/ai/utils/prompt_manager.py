@@ -3,11 +3,22 @@ Mô-đun quản lý prompt hệ thống
 Phụ trách quản lý và cập nhật prompt hệ thống, bao gồm khởi tạo nhanh và tăng cường bất đồng bộ
 """
 
+import asyncio
 import os
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
 from app.core.logger import setup_logging
-from jinja2 import Template
+from jinja2 import Environment, Template
 from app.ai.utils.paths import get_agent_base_prompt_file
+from app.ai.utils.cache import async_cache_manager, CacheType
+from app.ai.utils.current_time import (
+    get_current_date,
+    get_current_time,
+    get_current_weekday,
+)
+from app.ai.utils.util import get_ip_info
+from app.ai.plugins_func.functions.get_weather import get_weather
+from app.ai.plugins_func.register import ActionResponse
 
 
 TAG = __name__
@@ -45,6 +56,43 @@ EMOJI_List = [
     "😜",
     "🙄",
 ]
+# Template in thẳng {{ emojiList }} (= str(list)), nên dựng sẵn chuỗi một lần thay vì mỗi lần render
+EMOJI_LIST_TEXT = str(EMOJI_List)
+
+# Environment dùng chung cho mọi PromptManager; Template đã biên dịch an toàn khi render đồng thời.
+# Giữ chế độ đồng bộ (enable_async=False): chế độ async thêm kiểm tra awaitable cho mọi biểu thức
+# và render chậm hơn nhiều, trong khi template này chỉ thay biến đơn giản
+_TEMPLATE_ENV = Environment(enable_async=False, autoescape=False, auto_reload=False)
+
+
+@lru_cache(maxsize=8)
+def _compile_template(path: str, mtime_ns: int) -> Tuple[str, Template]:
+    """Đọc và biên dịch template một lần cho mỗi (đường dẫn, mtime), dùng chung giữa các kết nối"""
+    with open(path, "r", encoding="utf-8") as f:
+        template_content = f.read()
+    return template_content, _TEMPLATE_ENV.from_string(template_content)
+
+
+# Các lần tra cứu vị trí/thời tiết đang chạy, dùng chung giữa mọi kết nối (singleflight)
+_INFLIGHT_LOOKUPS: Dict[Tuple[str, str], "asyncio.Task[str]"] = {}
+
+
+async def _singleflight(
+    key: Tuple[str, str], factory: Callable[[], Awaitable[str]]
+) -> str:
+    """Gộp các lần gọi đồng thời cùng key thành một lần chạy factory()"""
+    task = _INFLIGHT_LOOKUPS.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _INFLIGHT_LOOKUPS[key] = task
+
+        def _release(done: "asyncio.Task[str]") -> None:
+            if _INFLIGHT_LOOKUPS.get(key) is done:
+                del _INFLIGHT_LOOKUPS[key]
+
+        task.add_done_callback(_release)
+    # shield: một caller bị hủy không làm hủy lần tra cứu dùng chung
+    return await asyncio.shield(task)
 
 
 class PromptManager:
@@ -54,11 +102,14 @@ class PromptManager:
         self.config = config
         self.logger = logger or setup_logging()
         self.base_prompt_template = None
+        # Template đã biên dịch sẵn, tránh parse/compile lại Jinja ở mỗi lần build prompt
+        self._compiled_template: Optional[Template] = None
+        self._template_lock = asyncio.Lock()
         self.last_update_time = 0
+        # Vị trí đọc được ở lần build trước, dùng để đọc kèm thời tiết trong cùng một MGET
+        self._last_local_address = ""
 
-        # Nhập trình quản lý bộ nhớ đệm toàn cục
-        from app.ai.utils.cache import async_cache_manager, CacheType
-
+        # Trình quản lý bộ nhớ đệm toàn cục
         self.cache_manager = async_cache_manager
         self.CacheType = CacheType
 
@@ -70,19 +121,22 @@ class PromptManager:
         try:
             # Xây dựng đường dẫn tuyệt đối tới file từ thư mục app
             template_path = get_agent_base_prompt_file()
-            cache_key = f"prompt_template:{template_path}"
 
-            # Luôn đọc từ file (không cache) để development không bị cache cũ
-            if os.path.exists(template_path):
-                with open(template_path, "r", encoding="utf-8") as f:
-                    template_content = f.read()
-
-                self.base_prompt_template = template_content
-                self.logger.bind(tag=TAG).debug("Đã tải template prompt cơ bản từ file")
-            else:
+            # Cache theo mtime: file được sửa khi development sẽ được biên dịch lại
+            try:
+                mtime_ns = os.stat(template_path).st_mtime_ns
+            except FileNotFoundError:
                 self.logger.bind(tag=TAG).warning(
                     f"Không tìm thấy tệp agent-base-prompt.txt tại {template_path}"
                 )
+                return
+
+            template_content, compiled_template = _compile_template(
+                str(template_path), mtime_ns
+            )
+            self._compiled_template = compiled_template
+            self.base_prompt_template = template_content
+            self.logger.bind(tag=TAG).debug("Đã tải template prompt cơ bản từ file")
         except Exception as e:
             self.logger.bind(tag=TAG).error(f"Tải template prompt thất bại: {e}")
 
@@ -122,8 +176,6 @@ class PromptManager:
 
     def _get_current_time_info(self) -> tuple:
         """Lấy thông tin thời gian hiện tại"""
-        from .current_time import get_current_date, get_current_weekday
-
         today_date = get_current_date()
         today_weekday = get_current_weekday()
 
@@ -135,7 +187,7 @@ class PromptManager:
             if not client_ip or client_ip == "unknown":
                 return "Vị trí chưa xác định"
 
-            cache_key = client_ip or "unknown_ip"
+            cache_key = client_ip
             # Lấy từ bộ nhớ đệm trước
             cached_location = await self.cache_manager.get(
                 self.CacheType.LOCATION, cache_key
@@ -143,16 +195,10 @@ class PromptManager:
             if cached_location is not None:
                 return cached_location
 
-            # Nếu không có trong bộ nhớ đệm, gọi API
-            from app.ai.utils.util import get_ip_info
-
-            ip_info = await get_ip_info(client_ip, self.logger)
-            city = ip_info.get("city", "Vị trí chưa xác định")
-            location = f"{city}"
-
-            # Lưu vào bộ nhớ đệm
-            await self.cache_manager.set(self.CacheType.LOCATION, cache_key, location)
-            return location
+            # Nếu không có trong bộ nhớ đệm, gọi API (các kết nối cùng IP dùng chung một lần gọi)
+            return await _singleflight(
+                ("location", cache_key), lambda: self._fetch_location(cache_key)
+            )
         except Exception as e:
             self.logger.bind(tag=TAG).error(f"Lấy thông tin vị trí thất bại: {e}")
             return "Vị trí chưa xác định"
@@ -167,24 +213,35 @@ class PromptManager:
             if cached_weather is not None:
                 return cached_weather
 
-            # Nếu không có thì gọi hàm get_weather
-            from app.ai.plugins_func.functions.get_weather import get_weather
-            from app.ai.plugins_func.register import ActionResponse
-
-            # Gọi hàm get_weather
-            result = await get_weather(conn, location=location, lang="vi_VN")
-            if isinstance(result, ActionResponse):
-                weather_report = result.result
-                await self.cache_manager.set(
-                    self.CacheType.WEATHER, location, weather_report
-                )
-                return weather_report
-            return "Không lấy được thông tin thời tiết"
-
+            # Nếu không có thì gọi hàm get_weather (dùng chung cho các kết nối cùng vị trí)
+            return await _singleflight(
+                ("weather", location), lambda: self._fetch_weather(conn, location)
+            )
         except Exception as e:
             self.logger.bind(tag=TAG).error(f"Lấy thông tin thời tiết thất bại: {e}")
             return "Không lấy được thông tin thời tiết"
 
+    async def _fetch_location(self, client_ip: str) -> str:
+        """Gọi API lấy vị trí theo IP và lưu vào bộ nhớ đệm"""
+        ip_info = await get_ip_info(client_ip, self.logger)
+        city = ip_info.get("city", "Vị trí chưa xác định")
+        location = f"{city}"
+
+        # Lưu vào bộ nhớ đệm
+        await self.cache_manager.set(self.CacheType.LOCATION, client_ip, location)
+        return location
+
+    async def _fetch_weather(self, conn, location: str) -> str:
+        """Gọi hàm get_weather và lưu kết quả vào bộ nhớ đệm"""
+        result = await get_weather(conn, location=location, lang="vi_VN")
+        if isinstance(result, ActionResponse):
+            weather_report = result.result
+            await self.cache_manager.set(
+                self.CacheType.WEATHER, location, weather_report
+            )
+            return weather_report
+        return "Không lấy được thông tin thời tiết"
+
     async def update_context_info(self, conn, client_ip: str):
         """Cập nhật đồng bộ thông tin ngữ cảnh"""
         try:
@@ -210,10 +267,12 @@ class PromptManager:
     ) -> str:
         """Xây dựng prompt hệ thống được tăng cường"""
         # Lazy load template if not loaded yet
-        if self.base_prompt_template is None:
-            await self._load_base_template()
+        if self._compiled_template is None:
+            async with self._template_lock:
+                if self._compiled_template is None:
+                    await self._load_base_template()
 
-        if not self.base_prompt_template:
+        if not self.base_prompt_template or self._compiled_template is None:
             return user_prompt
 
         try:
@@ -225,37 +284,39 @@ class PromptManager:
             weather_info = ""
 
             if client_ip:
-                # Lấy thông tin vị trí (từ cache toàn cục)
-                local_address = (
-                    await self.cache_manager.get(
-                        self.CacheType.LOCATION, client_ip or "unknown_ip"
-                    )
-                    or ""
-                )
+                # Lấy vị trí và thời tiết (từ cache toàn cục) trong một round-trip MGET.
+                # Khóa thời tiết là vị trí, nên đọc kèm thời tiết của vị trí lần trước;
+                # chỉ khi vị trí đã đổi mới cần đọc thêm một lần nữa
+                last_address = self._last_local_address
+                cache_items = [(self.CacheType.LOCATION, client_ip)]
+                if last_address:
+                    cache_items.append((self.CacheType.WEATHER, last_address))
+                cached_values = await self.cache_manager.mget(cache_items)
+                local_address = cached_values[0] or ""
 
-                # Lấy thông tin thời tiết (từ cache toàn cục)
                 if local_address:
-                    weather_info = (
-                        await self.cache_manager.get(
-                            self.CacheType.WEATHER, local_address
+                    if local_address == last_address:
+                        weather_info = cached_values[1] or ""
+                    else:
+                        weather_info = (
+                            await self.cache_manager.get(
+                                self.CacheType.WEATHER, local_address
+                            )
+                            or ""
                         )
-                        or ""
-                    )
+                    self._last_local_address = local_address
 
             # Thay thế biến trong template
-            from .current_time import get_current_time
-
             current_time = get_current_time()
 
-            template = Template(self.base_prompt_template)
-            enhanced_prompt = template.render(
+            enhanced_prompt = self._compiled_template.render(
                 base_prompt=user_prompt,
                 current_time=current_time,
                 today_date=today_date,
                 today_weekday=today_weekday,
                 local_address=local_address,
                 weather_info=weather_info,
-                emojiList=EMOJI_List,
+                emojiList=EMOJI_LIST_TEXT,
                 device_id=device_id,
                 user_profile=user_profile,
                 *args,
@@ -0,0 +1,64 @@
+"""
+Bộ nạp provider dùng chung cho các factory create_instance
+Module provider được import một lần rồi lưu lại, không dò hệ thống tệp mỗi lần tạo instance
+"""
+
+import importlib
+from types import ModuleType
+from typing import Dict, Tuple
+
+# Loại provider -> (package chứa provider, module lồng trong thư mục cùng tên hay không,
+# tên lớp provider được export, tên hiển thị trong thông báo lỗi)
+PROVIDER_SPECS: Dict[str, Tuple[str, bool, str, str]] = {
+    "intent": ("app.ai.providers.intent", True, "IntentProvider", "intent"),
+    "llm": ("app.ai.providers.llm", True, "LLMProvider", "LLM"),
+    "memory": ("app.ai.providers.memory", True, "MemoryProvider", "dịch vụ bộ nhớ"),
+    "asr": ("app.ai.providers.asr", False, "ASRProvider", "ASR"),
+    "vad": ("app.ai.providers.vad", False, "VADProvider", "VAD"),
+    "vllm": ("app.ai.providers.vllm", False, "VLLMProvider", "VLLM"),
+    "tts": ("app.ai.providers.tts", False, "TTSProvider", "TTS"),
+}
+
+_MODULE_CACHE: Dict[Tuple[str, str], ModuleType] = {}
+
+
+def _import_provider_module(kind: str, class_name: str) -> ModuleType:
+    """Import module provider của loại kind theo tên class_name và lưu vào cache
+
+    Module nằm ở <package>.<name>.<name> (nested) hoặc <package>.<name>.
+    """
+    key = (kind, class_name)
+    module = _MODULE_CACHE.get(key)
+    if module is not None:
+        return module
+
+    package, nested, _, label = PROVIDER_SPECS[kind]
+    if not class_name or not class_name.isidentifier():
+        raise ValueError(
+            f"Loại {label} không được hỗ trợ: {class_name}, vui lòng kiểm tra cấu hình type."
+        )
+
+    lib_name = (
+        f"{package}.{class_name}.{class_name}" if nested else f"{package}.{class_name}"
+    )
+    try:
+        module = importlib.import_module(lib_name)
+    except ModuleNotFoundError as e:
+        # Chỉ coi là "không hỗ trợ" khi chính module provider (hoặc thư mục chứa nó)
+        # không tồn tại, lỗi thiếu thư viện phụ thuộc bên trong provider vẫn được ném ra
+        if e.name and e.name.startswith(f"{package}.") and (
+            f"{lib_name}.".startswith(f"{e.name}.")
+        ):
+            raise ValueError(
+                f"Loại {label} không được hỗ trợ: {class_name}, vui lòng kiểm tra cấu hình type. Module: {lib_name}"
+            ) from e
+        raise
+
+    _MODULE_CACHE[key] = module
+    return module
+
+
+def load_provider(kind: str, class_name: str, *args, **kwargs):
+    """Tạo instance provider của loại kind (xem PROVIDER_SPECS) theo tên class_name"""
+    module = _import_provider_module(kind, class_name)
+    return getattr(module, PROVIDER_SPECS[kind][2])(*args, **kwargs)
@@ -1,9 +1,29 @@
 """Utility functions để serialize object thành readable format"""
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 import json
 from app.ai.plugins_func.register import ActionResponse
 
+# Cách chuyển đổi theo từng lớp (model_dump/dict), chỉ dò thuộc tính một lần cho mỗi kiểu
+_DUMPERS: Dict[type, Optional[Callable[[Any], Dict[str, Any]]]] = {}
+
+
+def _get_dumper(cls: type) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """Lấy hàm chuyển đổi model thành dict của lớp cls (None nếu không có)"""
+    try:
+        return _DUMPERS[cls]
+    except KeyError:
+        pass
+    if hasattr(cls, "model_dump"):
+        # Pydantic v2: model_dump() thay cho .dict() đã deprecated
+        dumper = cls.model_dump
+    elif hasattr(cls, "dict"):
+        dumper = cls.dict
+    else:
+        dumper = None
+    _DUMPERS[cls] = dumper
+    return dumper
+
 
 def serialize_object(obj: Any) -> Dict[str, Any]:
     """
@@ -23,13 +43,15 @@ def serialize_object(obj: Any) -> Dict[str, Any]:
             "response": obj.response,
         }
 
-    # Nếu là Pydantic model, sử dụng .dict()
-    if hasattr(obj, "dict"):
-        return obj.dict()
+    # Nếu là Pydantic model, sử dụng model_dump()/.dict()
+    dumper = _get_dumper(type(obj))
+    if dumper is not None:
+        return dumper(obj)
 
-    # Nếu là object thông thường, lấy __dict__
-    if hasattr(obj, "__dict__"):
-        return obj.__dict__
+    # Nếu là object thông thường, lấy __dict__ (trả về trực tiếp, không sao chép)
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        return attrs
 
     # Fallback
     return {"value": str(obj)}
@@ -1,4 +1,5 @@
 import json
+import re
 from typing import Iterable, Optional
 
 TAG = __name__
@@ -35,53 +36,67 @@ EMOJI_RANGES = [
     (0x2700, 0x27BF),
 ]
 
-PUNCTUATION_SET = {
-    "，",
-    ",",  # Dấu phẩy Trung + Anh
-    "。",
-    ".",  # Dấu chấm Trung + Anh
-    "！",
-    "!",  # Dấu chấm than Trung + Anh
-    "“",
-    "”",
-    '"',  # Dấu ngoặc kép Trung + Anh
-    "：",
-    ":",  # Dấu hai chấm Trung + Anh
-    "-",
-    "－",  # Gạch nối tiếng Anh + gạch ngang full-width
-    "、",  # Dấu ngắt câu tiếng Trung
-    "[",
-    "]",  # Ngoặc vuông
-    "【",
-    "】",  # Ngoặc vuông tiếng Trung
-}
+# Lớp ký tự emoji biên dịch sẵn, quét chuỗi trong C thay vì so từng khoảng cho mỗi ký tự
+_EMOJI_CLASS = "".join(f"{chr(start)}-{chr(end)}" for start, end in EMOJI_RANGES)
+_EMOJI_RE = re.compile(f"[{_EMOJI_CLASS}]")
+_EMOJI_OR_NEWLINE_RE = re.compile(f"[{_EMOJI_CLASS}\n]")
+# Tìm emoji cảm xúc đầu tiên trong một lần quét
+_EMOTION_EMOJI_RE = re.compile("[" + "".join(EMOJI_MAP) + "]")
+
+PUNCTUATION_SET = frozenset(
+    {
+        "，",
+        ",",  # Dấu phẩy Trung + Anh
+        "。",
+        ".",  # Dấu chấm Trung + Anh
+        "！",
+        "!",  # Dấu chấm than Trung + Anh
+        "“",
+        "”",
+        '"',  # Dấu ngoặc kép Trung + Anh
+        "：",
+        ":",  # Dấu hai chấm Trung + Anh
+        "-",
+        "－",  # Gạch nối tiếng Anh + gạch ngang full-width
+        "、",  # Dấu ngắt câu tiếng Trung
+        "[",
+        "]",  # Ngoặc vuông
+        "【",
+        "】",  # Ngoặc vuông tiếng Trung
+    }
+)
+# Khoảng trắng thường gặp + dấu câu: một phép tra cứu hash cho phần lớn ký tự
+_SPACE_OR_PUNCT = PUNCTUATION_SET | frozenset(" \t\n\r\f\v\u00a0\u3000")
+
+
+# Khoảng trắng, dấu câu và emoji cần loại ở đầu chuỗi, quét bằng regex trong C
+_STRIP_CLASS = r"\s" + "".join(re.escape(c) for c in PUNCTUATION_SET) + _EMOJI_CLASS
+_LEADING_STRIP_RE = re.compile(f"[{_STRIP_CLASS}]+")
 
 
 def get_string_no_punctuation_or_emoji(
     s: str, keep_trailing_punctuations: Optional[Iterable[str]] = None
 ):
     """Loại bỏ khoảng trắng, dấu câu và emoji ở đầu cuối chuỗi"""
-    chars = list(s)
     keep_trailing = (
         set(keep_trailing_punctuations) if keep_trailing_punctuations else None
     )
     # Xử lý ký tự ở phần đầu
-    start = 0
-    while start < len(chars) and is_punctuation_or_emoji(chars[start]):
-        start += 1
-    # Xử lý ký tự ở phần cuối
-    end = len(chars) - 1
-    while end >= start and is_punctuation_or_emoji(chars[end]):
-        char = chars[end]
-        if keep_trailing and char in keep_trailing:
+    match = _LEADING_STRIP_RE.match(s)
+    start = match.end() if match else 0
+    # Xử lý ký tự ở phần cuối: duyệt chỉ số trực tiếp trên chuỗi, dừng ngay khi gặp
+    # ký tự cần giữ (tìm kiếm regex neo \Z phải thử lại từ mọi vị trí trong chuỗi)
+    end = len(s) - 1
+    while end >= start and is_punctuation_or_emoji(s[end]):
+        if keep_trailing and s[end] in keep_trailing:
             break
         end -= 1
-    return "".join(chars[start : end + 1])
+    return s[start : end + 1]
 
 
 def is_punctuation_or_emoji(char):
     """Kiểm tra ký tự có phải khoảng trắng, dấu câu chỉ định hoặc emoji"""
-    if char.isspace() or char in PUNCTUATION_SET:
+    if char in _SPACE_OR_PUNCT or char.isspace():
         return True
     return is_emoji(char)
 
@@ -90,11 +105,10 @@ async def get_emotion(conn, text):
     """Lấy thông tin cảm xúc trong văn bản"""
     emoji = "🙂"
     emotion = "happy"
-    for char in text:
-        if char in EMOJI_MAP:
-            emoji = char
-            emotion = EMOJI_MAP[char]
-            break
+    match = _EMOTION_EMOJI_RE.search(text)
+    if match:
+        emoji = match.group(0)
+        emotion = EMOJI_MAP[emoji]
     try:
         await conn.send_raw(
             json.dumps(
@@ -113,10 +127,12 @@ async def get_emotion(conn, text):
 
 def is_emoji(char):
     """Kiểm tra ký tự có phải emoji hay không"""
-    code_point = ord(char)
-    return any(start <= code_point <= end for start, end in EMOJI_RANGES)
+    return _EMOJI_RE.match(char) is not None
 
 
 def check_emoji(text):
     """Loại bỏ toàn bộ emoji trong văn bản"""
-    return ''.join(char for char in text if not is_emoji(char) and char != "\n")
+    if text.isascii():
+        # Văn bản ASCII không thể chứa emoji, chỉ cần bỏ ký tự xuống dòng
+        return text.replace("\n", "")
+    return _EMOJI_OR_NEWLINE_RE.sub("", text)
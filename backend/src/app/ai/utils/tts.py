@@ -1,14 +1,9 @@
-import os
 import re
-import sys
-import importlib
+import string
+from functools import lru_cache
+from app.ai.utils.providers_loader import load_provider
 from app.core.logger import setup_logging
 
-# Thêm thư mục gốc dự án vào đường dẫn Python
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.abspath(os.path.join(current_dir, "..", "..", ".."))
-sys.path.insert(0, project_root)
-
 logger = setup_logging()
 
 punctuation_set = {
@@ -35,21 +30,8 @@ punctuation_set = {
 
 
 def create_instance(class_name, *args, **kwargs):
-    # Tạo instance TTS
-    # Đường dẫn trong src/app/ai/providers/tts
-    tts_path = os.path.join(
-        project_root, "app", "ai", "providers", "tts", f"{class_name}.py"
-    )
-
-    if os.path.exists(tts_path):
-        lib_name = f"app.ai.providers.tts.{class_name}"
-        if lib_name not in sys.modules:
-            sys.modules[lib_name] = importlib.import_module(lib_name)
-        return sys.modules[lib_name].TTSProvider(*args, **kwargs)
-
-    raise ValueError(
-        f"Loại TTS không được hỗ trợ: {class_name}, vui lòng kiểm tra cấu hình type. Đường dẫn: {tts_path}"
-    )
+    # Tạo instance TTS (app.ai.providers.tts.<class_name>)
+    return load_provider("tts", class_name, *args, **kwargs)
 
 
 class MarkdownCleaner:
@@ -57,8 +39,8 @@ class MarkdownCleaner:
     Đóng gói logic làm sạch Markdown: chỉ cần gọi MarkdownCleaner.clean_markdown(text)
     """
 
-    # Ký tự công thức
-    NORMAL_FORMULA_CHARS = re.compile(r"[a-zA-Z\\^_{}\+\-\(\)\[\]=]")
+    # Ký tự công thức (tra cứu tập hợp, không cần chạy regex cho mỗi "$...$")
+    NORMAL_FORMULA_CHARS = frozenset(string.ascii_letters + "\\^_{}+-()[]=")
 
     @staticmethod
     def _replace_inline_dollar(m: re.Match) -> str:
@@ -68,7 +50,7 @@ class MarkdownCleaner:
           - Nếu không (chỉ số/đơn vị tiền tệ, ...) => giữ nguyên "$...$"
         """
         content = m.group(1)
-        if MarkdownCleaner.NORMAL_FORMULA_CHARS.search(content):
+        if not MarkdownCleaner.NORMAL_FORMULA_CHARS.isdisjoint(content):
             return content
         else:
             return m.group(0)
@@ -118,39 +100,62 @@ class MarkdownCleaner:
 
     # Tiền biên dịch toàn bộ biểu thức chính quy (theo tần suất sử dụng)
     # Các phương thức replace_xxx phải được định nghĩa trước để có thể tham chiếu trong danh sách.
+    # Mỗi mục kèm các chuỗi con bắt buộc phải có để regex khớp được: nếu văn bản hiện tại
+    # không chứa chuỗi nào trong số đó thì bỏ qua hẳn lượt quét đó (phép "in" nhanh hơn regex.sub).
     REGEXES = [
-        (re.compile(r"```.*?```", re.DOTALL), ""),  # Khối mã
-        (re.compile(r"^#+\s*", re.MULTILINE), ""),  # Tiêu đề
-        (re.compile(r"(\*\*|__)(.*?)\1"), r"\2"),  # Chữ đậm
-        (re.compile(r"(\*|_)(?=\S)(.*?)(?<=\S)\1"), r"\2"),  # Chữ nghiêng
-        (re.compile(r"!\[.*?\]\(.*?\)"), ""),  # Hình ảnh
-        (re.compile(r"\[(.*?)\]\(.*?\)"), r"\1"),  # Liên kết
-        (re.compile(r"^\s*>+\s*", re.MULTILINE), ""),  # Trích dẫn
+        (("```",), re.compile(r"```.*?```", re.DOTALL), ""),  # Khối mã
+        (("#",), re.compile(r"^#+\s*", re.MULTILINE), ""),  # Tiêu đề
+        (("**", "__"), re.compile(r"(\*\*|__)(.*?)\1"), r"\2"),  # Chữ đậm
+        (("*", "_"), re.compile(r"(\*|_)(?=\S)(.*?)(?<=\S)\1"), r"\2"),  # Chữ nghiêng
+        (("![",), re.compile(r"!\[.*?\]\(.*?\)"), ""),  # Hình ảnh
+        (("](",), re.compile(r"\[(.*?)\]\(.*?\)"), r"\1"),  # Liên kết
+        ((">",), re.compile(r"^\s*>+\s*", re.MULTILINE), ""),  # Trích dẫn
         (
+            ("|",),
             re.compile(r"(?P<table_block>(?:^[^\n]*\|[^\n]*\n)+)", re.MULTILINE),
             _replace_table_block,
         ),
-        (re.compile(r"^\s*[*+-]\s*", re.MULTILINE), "- "),  # Danh sách
-        (re.compile(r"\$\$.*?\$\$", re.DOTALL), ""),  # Công thức dạng khối
+        (("*", "+", "-"), re.compile(r"^\s*[*+-]\s*", re.MULTILINE), "- "),  # Danh sách
+        (("$$",), re.compile(r"\$\$.*?\$\$", re.DOTALL), ""),  # Công thức dạng khối
         (
+            ("$",),
             re.compile(r"(?<![A-Za-z0-9])\$([^\n$]+)\$(?![A-Za-z0-9])"),
             _replace_inline_dollar,
         ),
-        (re.compile(r"\n{2,}"), "\n"),  # Dòng trống dư
+        (("\n\n",), re.compile(r"\n{2,}"), "\n"),  # Dòng trống dư
     ]
 
+    # Chỉ ghi nhớ kết quả cho văn bản ngắn (câu chào, xác nhận... lặp lại nhiều lần)
+    CACHE_MAX_TEXT_LEN = 4096
+
     @staticmethod
     def clean_markdown(text: str) -> str:
         """
         Hàm vào chính: lần lượt áp dụng toàn bộ regex để loại bỏ hoặc thay thế phần tử Markdown
         """
-        # Kiểm tra văn bản có chỉ gồm tiếng Anh và dấu câu cơ bản hay không
-        if text and all(
-            (c.isascii() or c.isspace() or c in punctuation_set) for c in text
+        if len(text) > MarkdownCleaner.CACHE_MAX_TEXT_LEN:
+            return MarkdownCleaner._clean_markdown(text)
+        return MarkdownCleaner._clean_markdown_cached(text)
+
+    @staticmethod
+    def _clean_markdown(text: str) -> str:
+        # Kiểm tra văn bản có chỉ gồm tiếng Anh và dấu câu cơ bản hay không.
+        # isascii() chạy trong C; chỉ khi có ký tự ngoài ASCII mới xét tập ký tự riêng biệt
+        if text and (
+            text.isascii()
+            or all(
+                (c.isascii() or c.isspace() or c in punctuation_set)
+                for c in set(text)
+            )
         ):
             # Giữ nguyên khoảng trắng gốc và trả về ngay
             return text
 
-        for regex, replacement in MarkdownCleaner.REGEXES:
-            text = regex.sub(replacement, text)
+        for triggers, regex, replacement in MarkdownCleaner.REGEXES:
+            if any(t in text for t in triggers):
+                text = regex.sub(replacement, text)
         return text.strip()
+
+    _clean_markdown_cached = staticmethod(
+        lru_cache(maxsize=1024)(_clean_markdown.__func__)
+    )
@@ -1,18 +1,33 @@
 import re
 import os
 import json
-import copy
+import time
 import wave
 import socket
-import requests
+import ipaddress
+import httpx
+import threading
 import subprocess
 import numpy as np
 from io import BytesIO
 from . import p3
 from pydub import AudioSegment
-from typing import Callable, Any
+from typing import Callable, Any, Iterator
+
+try:  # pragma: no cover - phụ thuộc môi trường
+    import av  # type: ignore
+except ImportError:
+    av = None  # type: ignore
 
 TAG = __name__
+
+# Biểu thức chính quy biên dịch sẵn một lần
+_JSON_RE = re.compile(r"(\{.*\})", re.DOTALL)
+_TOOL_NAME_RE = re.compile(r"[^a-zA-Z0-9_\-\u4e00-\u9fff]")
+
+# Client HTTP bất đồng bộ dùng chung cho tra cứu IP (tạo khi cần, đóng khi shutdown)
+_http_client = None
+
 emoji_map = {
     "neutral": "😶",
     "happy": "🙂",
@@ -38,13 +53,23 @@ emoji_map = {
 }
 
 
+# (thời điểm lấy, IP) của lần dò IP cục bộ thành công gần nhất
+_local_ip_cache = (0.0, None)
+_LOCAL_IP_TTL = 60  # giây
+
+
 def get_local_ip():
+    global _local_ip_cache
+    now = time.monotonic()
+    cached_at, cached_ip = _local_ip_cache
+    if cached_ip and now - cached_at < _LOCAL_IP_TTL:
+        return cached_ip
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # Connect to Google's DNS servers
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            # Connect to Google's DNS servers
+            s.connect(("8.8.8.8", 80))
+            local_ip = s.getsockname()[0]
+        _local_ip_cache = (now, local_ip)
         return local_ip
     except Exception:
         return "127.0.0.1"
@@ -58,40 +83,27 @@ def is_private_ip(ip_addr):
     @return {bool} True if the IP address is private, False otherwise.
     """
     try:
-        # Validate IPv4 or IPv6 address format
-        if not re.match(
-            r"^(\d{1,3}\.){3}\d{1,3}$|^([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}$", ip_addr
-        ):
-            return False  # Invalid IP address format
-
-        # IPv4 private address ranges
-        if "." in ip_addr:  # IPv4 address
-            ip_parts = list(map(int, ip_addr.split(".")))
-            if ip_parts[0] == 10:
-                return True  # 10.0.0.0/8 range
-            elif ip_parts[0] == 172 and 16 <= ip_parts[1] <= 31:
-                return True  # 172.16.0.0/12 range
-            elif ip_parts[0] == 192 and ip_parts[1] == 168:
-                return True  # 192.168.0.0/16 range
-            elif ip_addr == "127.0.0.1":
-                return True  # Loopback address
-            elif ip_parts[0] == 169 and ip_parts[1] == 254:
-                return True  # Link-local address 169.254.0.0/16
-            else:
-                return False  # Not a private IPv4 address
-        else:  # IPv6 address
-            ip_addr = ip_addr.lower()
-            if ip_addr.startswith("fc00:") or ip_addr.startswith("fd00:"):
-                return True  # Unique Local Addresses (FC00::/7)
-            elif ip_addr == "::1":
-                return True  # Loopback address
-            elif ip_addr.startswith("fe80:"):
-                return True  # Link-local unicast addresses (FE80::/10)
-            else:
-                return False  # Not a private IPv6 address
+        ip = ipaddress.ip_address(ip_addr)
+    except ValueError:
+        return False  # Invalid IP address format
+    # Private ranges (10/8, 172.16/12, 192.168/16, FC00::/7, ...), loopback and link-local
+    return ip.is_private or ip.is_loopback or ip.is_link_local
+
 
-    except (ValueError, IndexError):
-        return False  # IP address format error or insufficient segments
+def _get_http_client() -> httpx.AsyncClient:
+    """Lấy client HTTP dùng chung, giữ kết nối HTTPS giữa các lần gọi"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=3.0)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Đóng client HTTP dùng chung (gọi khi shutdown ứng dụng)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 async def get_ip_info(ip_addr, logger):
@@ -113,15 +125,17 @@ async def get_ip_info(ip_addr, logger):
             return ip_info
 
         url = f"https://whois.pconline.com.cn/ipJson.jsp?json=true&ip={ip_addr}"
-        resp = requests.get(url, timeout=3)
+        # Gọi bất đồng bộ để không chặn event loop khi tra cứu IP
+        resp = await _get_http_client().get(url)
         resp.raise_for_status()
-        data = resp.json()
+        # Giải mã theo charset của phản hồi (API trả về GBK), không mặc định UTF-8
+        data = json.loads(resp.text)
         ip_info = {"city": data.get("city", "Vị trí chưa xác định")}
 
         # Lưu vào bộ nhớ đệm
         await async_cache_manager.set(CacheType.IP_INFO, cache_key, ip_info)
         return ip_info
-    except requests.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         logger.bind(tag=TAG).error(f"Timeout khi lấy thông tin IP {ip_addr}: {e}")
         return {"city": "Vị trí chưa xác định"}
     except Exception as e:
@@ -135,26 +149,20 @@ def write_json_file(file_path, data):
         json.dump(data, file, ensure_ascii=False, indent=4)
 
 
+# Dấu câu full-width, half-width và khoảng trắng (half-width + full-width) cần loại bỏ
+_PUNCTUATION_AND_SPACE_TABLE = str.maketrans(
+    "",
+    "",
+    "！＂＃＄％＆＇（）＊＋，－。／：；＜＝＞？＠［＼］＾＿｀｛｜｝～"
+    + r'!"#$%&\'()*+,-./:;<=>?@[\]^_`{|}~'
+    + " "
+    + "　",
+)
+
+
 def remove_punctuation_and_length(text):
-    # Phạm vi Unicode của ký tự full-width và half-width
-    full_width_punctuations = (
-        "！＂＃＄％＆＇（）＊＋，－。／：；＜＝＞？＠［＼］＾＿｀｛｜｝～"
-    )
-    half_width_punctuations = r'!"#$%&\'()*+,-./:;<=>?@[\]^_`{|}~'
-    space = " "  # Khoảng trắng half-width
-    full_width_space = "　"  # Khoảng trắng full-width
-
-    # Loại bỏ ký tự full-width, half-width và khoảng trắng
-    result = "".join(
-        [
-            char
-            for char in text
-            if char not in full_width_punctuations
-            and char not in half_width_punctuations
-            and char not in space
-            and char not in full_width_space
-        ]
-    )
+    # Loại bỏ ký tự full-width, half-width và khoảng trắng trong một lần duyệt (C)
+    result = text.translate(_PUNCTUATION_AND_SPACE_TABLE)
 
     if result == "Yeah":
         return 0, ""
@@ -216,13 +224,95 @@ def check_ffmpeg_installed():
 
 def extract_json_from_string(input_string):
     """Trích xuất phần JSON trong chuỗi"""
-    pattern = r"(\{.*\})"
-    match = re.search(pattern, input_string, re.DOTALL)  # Thêm re.DOTALL
+    match = _JSON_RE.search(input_string)  # Đã biên dịch với re.DOTALL
     if match:
         return match.group(1)  # Trả về chuỗi JSON được trích xuất
     return None
 
 
+# Bộ mã hóa Opus 16kHz/mono theo từng luồng, tránh khởi tạo trạng thái libopus mỗi lần gọi
+_opus_encoder_local = threading.local()
+
+
+def _get_opus_encoder():
+    """Lấy bộ mã hóa Opus của luồng hiện tại, đã được đặt lại trạng thái"""
+    encoder = getattr(_opus_encoder_local, "encoder", None)
+    if encoder is None:
+        import opuslib_next
+
+        encoder = opuslib_next.Encoder(16000, 1, opuslib_next.APPLICATION_AUDIO)
+        _opus_encoder_local.encoder = encoder
+    else:
+        # Xóa trạng thái còn lại từ lần mã hóa trước (OPUS_RESET_STATE)
+        encoder.reset_state()
+    return encoder
+
+
+def _pcm_to_frames(raw_data, frame_size: int) -> np.ndarray:
+    """
+    Chia dữ liệu PCM 16-bit thành mảng (số khung, frame_size) trong một lần sao chép,
+    khung cuối không đủ dữ liệu được chèn thêm số 0
+    """
+    frame_bytes = frame_size * 2  # 16bit=2bytes/sample
+    total_bytes = len(raw_data)
+    frame_count = -(-total_bytes // frame_bytes)
+    frames = np.zeros((frame_count, frame_size), dtype=np.int16)
+    frames.reshape(-1).view(np.uint8)[:total_bytes] = np.frombuffer(
+        raw_data, dtype=np.uint8
+    )
+    return frames
+
+
+def _iter_pcm_frames(pcm_chunks, frame_size: int) -> Iterator[np.ndarray]:
+    """
+    Gom các đoạn PCM đến dần thành từng khung frame_size mẫu; phần dư (< 1 khung)
+    được giữ lại ghép với đoạn sau, khung cuối cùng được chèn thêm số 0
+    """
+    frame_bytes = frame_size * 2  # 16bit=2bytes/sample
+    tail = b""
+    for chunk in pcm_chunks:
+        total = len(tail) + len(chunk)
+        full = total - total % frame_bytes
+        if not full:
+            tail += chunk
+            continue
+        # Chép phần dư và đoạn mới thẳng vào một bộ đệm int16 liền mạch (không nối bytes)
+        frames = np.empty((full // frame_bytes, frame_size), dtype=np.int16)
+        flat = frames.reshape(-1).view(np.uint8)
+        used = full - len(tail)
+        flat[: len(tail)] = np.frombuffer(tail, dtype=np.uint8)
+        flat[len(tail) :] = np.frombuffer(chunk, dtype=np.uint8, count=used)
+        yield from frames
+        tail = bytes(memoryview(chunk)[used:])
+    if tail:
+        yield from _pcm_to_frames(tail, frame_size)
+
+
+def _iter_pcm16k(source, file_type: str = None) -> Iterator[bytes]:
+    """
+    Giải mã âm thanh (đường dẫn tệp hoặc BytesIO) thành các đoạn PCM mono/16kHz/16-bit
+    little-endian. Dùng PyAV để giải mã dần ngay trong tiến trình; nếu chưa cài PyAV
+    thì dùng pydub (gọi ffmpeg, giải mã cả tệp một lần)
+    """
+    if av is not None:
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=16000)
+        with av.open(source) as container:
+            stream = container.streams.audio[0]
+            for frame in container.decode(stream):
+                for out_frame in resampler.resample(frame):
+                    yield out_frame.to_ndarray().tobytes()
+        # Xả các mẫu còn lại trong bộ resample
+        for out_frame in resampler.resample(None):
+            yield out_frame.to_ndarray().tobytes()
+        return
+
+    # Tham số -nostdin: không đọc từ stdin nếu không FFmpeg sẽ treo
+    audio = AudioSegment.from_file(source, format=file_type, parameters=["-nostdin"])
+    # Chuyển sang mono/tần số 16kHz/mã hóa little-endian 16-bit (đảm bảo khớp encoder)
+    audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+    yield audio.raw_data
+
+
 def audio_to_data_stream(
     audio_file_path, is_opus=True, callback: Callable[[Any], Any] = None
 ) -> None:
@@ -230,17 +320,9 @@ def audio_to_data_stream(
     file_type = os.path.splitext(audio_file_path)[1]
     if file_type:
         file_type = file_type.lstrip(".")
-    # Đọc tệp âm thanh; tham số -nostdin: không đọc từ stdin nếu không FFmpeg sẽ treo
-    audio = AudioSegment.from_file(
-        audio_file_path, format=file_type, parameters=["-nostdin"]
-    )
-
-    # Chuyển sang mono/tần số 16kHz/mã hóa little-endian 16-bit (đảm bảo khớp encoder)
-    audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-
-    # Lấy dữ liệu PCM gốc (16-bit little-endian)
-    raw_data = audio.raw_data
-    pcm_to_data_stream(raw_data, is_opus, callback)
+    # Giải mã dần thành PCM gốc (mono/16kHz/16-bit little-endian, khớp với encoder)
+    pcm_chunks = _iter_pcm16k(audio_file_path, file_type)
+    pcm_to_data_stream(pcm_chunks, is_opus, callback)
 
 
 def audio_to_data(audio_file_path: str, is_opus: bool = True) -> list[bytes]:
@@ -250,25 +332,15 @@ def audio_to_data(audio_file_path: str, is_opus: bool = True) -> list[bytes]:
         audio_file_path: Đường dẫn tệp âm thanh
         is_opus: Có mã hóa Opus hay không
     """
-    import opuslib_next
-
     # Lấy phần mở rộng của tệp
     file_type = os.path.splitext(audio_file_path)[1]
     if file_type:
         file_type = file_type.lstrip(".")
-    # Đọc tệp âm thanh; tham số -nostdin: không đọc từ stdin nếu không FFmpeg sẽ treo
-    audio = AudioSegment.from_file(
-        audio_file_path, format=file_type, parameters=["-nostdin"]
-    )
-
-    # Chuyển sang mono/tần số 16kHz/mã hóa little-endian 16-bit (đảm bảo khớp encoder)
-    audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+    # Giải mã dần thành PCM gốc (mono/16kHz/16-bit little-endian, khớp với encoder)
+    pcm_chunks = _iter_pcm16k(audio_file_path, file_type)
 
-    # Lấy dữ liệu PCM gốc (16-bit little-endian)
-    raw_data = audio.raw_data
-
-    # Khởi tạo bộ mã hóa Opus
-    encoder = opuslib_next.Encoder(16000, 1, opuslib_next.APPLICATION_AUDIO)
+    # Lấy bộ mã hóa Opus (dùng lại theo luồng)
+    encoder = _get_opus_encoder()
 
     # Tham số mã hóa
     frame_duration = 60  # 60ms per frame
@@ -276,21 +348,12 @@ def audio_to_data(audio_file_path: str, is_opus: bool = True) -> list[bytes]:
 
     datas = []
     # Xử lý dữ liệu âm thanh theo khung (bao gồm thêm số 0 ở cuối nếu thiếu)
-    for i in range(0, len(raw_data), frame_size * 2):  # 16bit=2bytes/sample
-        # Lấy dữ liệu nhị phân của khung hiện tại
-        chunk = raw_data[i : i + frame_size * 2]
-
-        # Nếu khung cuối không đủ dữ liệu thì chèn thêm số 0
-        if len(chunk) < frame_size * 2:
-            chunk += b"\x00" * (frame_size * 2 - len(chunk))
-
+    for frame in _iter_pcm_frames(pcm_chunks, frame_size):
         if is_opus:
-            # Chuyển sang mảng numpy để xử lý
-            np_frame = np.frombuffer(chunk, dtype=np.int16)
             # Mã hóa dữ liệu Opus
-            frame_data = encoder.encode(np_frame.tobytes(), frame_size)
+            frame_data = encoder.encode(frame.tobytes(), frame_size)
         else:
-            frame_data = chunk if isinstance(chunk, bytes) else bytes(chunk)
+            frame_data = frame.tobytes()
 
         datas.append(frame_data)
 
@@ -307,43 +370,33 @@ def audio_bytes_to_data_stream(
         # Giải mã trực tiếp bằng p3
         return p3.decode_opus_from_bytes_stream(audio_bytes, callback)
     else:
-        # Định dạng khác sử dụng pydub
-        audio = AudioSegment.from_file(
-            BytesIO(audio_bytes), format=file_type, parameters=["-nostdin"]
-        )
-        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-        raw_data = audio.raw_data
-        pcm_to_data_stream(raw_data, is_opus, callback)
+        # Định dạng khác: giải mã dần bằng PyAV (hoặc pydub nếu không có PyAV)
+        pcm_chunks = _iter_pcm16k(BytesIO(audio_bytes), file_type)
+        pcm_to_data_stream(pcm_chunks, is_opus, callback)
 
 
 def pcm_to_data_stream(raw_data, is_opus=True, callback: Callable[[Any], Any] = None):
-    import opuslib_next
-
-    # Khởi tạo bộ mã hóa Opus
-    encoder = opuslib_next.Encoder(16000, 1, opuslib_next.APPLICATION_AUDIO)
+    """
+    Mã hóa PCM thành từng khung opus/pcm và gửi qua callback.
+    raw_data có thể là bytes hoặc một iterator các đoạn bytes (mã hóa ngay khi đủ khung)
+    """
+    # Lấy bộ mã hóa Opus (dùng lại theo luồng)
+    encoder = _get_opus_encoder()
 
     # Tham số mã hóa
     frame_duration = 60  # 60ms per frame
     frame_size = int(16000 * frame_duration / 1000)  # 960 samples/frame
 
-    # Xử lý dữ liệu âm thanh theo từng khung (bao gồm thêm số 0 ở cuối nếu thiếu)
-    for i in range(0, len(raw_data), frame_size * 2):  # 16bit=2bytes/sample
-        # Lấy dữ liệu nhị phân của khung hiện tại
-        chunk = raw_data[i : i + frame_size * 2]
-
-        # Nếu khung cuối không đủ dữ liệu thì chèn thêm số 0
-        if len(chunk) < frame_size * 2:
-            chunk += b"\x00" * (frame_size * 2 - len(chunk))
+    if isinstance(raw_data, (bytes, bytearray, memoryview)):
+        raw_data = (raw_data,)
 
+    # Xử lý dữ liệu âm thanh theo từng khung (bao gồm thêm số 0 ở cuối nếu thiếu)
+    for frame in _iter_pcm_frames(raw_data, frame_size):
         if is_opus:
-            # Chuyển sang mảng numpy để xử lý
-            np_frame = np.frombuffer(chunk, dtype=np.int16)
             # Mã hóa dữ liệu Opus
-            frame_data = encoder.encode(np_frame.tobytes(), frame_size)
-            callback(frame_data)
+            callback(encoder.encode(frame.tobytes(), frame_size))
         else:
-            frame_data = chunk if isinstance(chunk, bytes) else bytes(chunk)
-            callback(frame_data)
+            callback(frame.tobytes())
 
 
 def opus_datas_to_wav_bytes(opus_datas, sample_rate=16000, channels=1):
@@ -353,19 +406,29 @@ def opus_datas_to_wav_bytes(opus_datas, sample_rate=16000, channels=1):
     import opuslib_next
 
     decoder = opuslib_next.Decoder(sample_rate, channels)
-    pcm_datas = []
 
     frame_duration = 60  # ms
     frame_size = int(sample_rate * frame_duration / 1000)  # 960
 
+    if not isinstance(opus_datas, (list, tuple)):
+        opus_datas = list(opus_datas)
+    # Cấp phát trước bộ đệm PCM cho toàn bộ khung, ghi đè tại chỗ thay vì nối list bytes
+    pcm_buffer = bytearray(len(opus_datas) * frame_size * channels * 2)
+    offset = 0
     for opus_frame in opus_datas:
         # Giải mã thành PCM (trả về bytes, 2 byte mỗi mẫu)
         pcm = decoder.decode(opus_frame, frame_size)
-        pcm_datas.append(pcm)
+        # Gán slice vượt quá cuối bộ đệm sẽ tự nới rộng nếu khung dài hơn dự kiến
+        pcm_buffer[offset : offset + len(pcm)] = pcm
+        offset += len(pcm)
+
+    return pcm_to_wav_bytes(memoryview(pcm_buffer)[:offset], sample_rate, channels)
 
-    pcm_bytes = b"".join(pcm_datas)
 
-    # Ghi vào luồng byte wav
+def pcm_to_wav_bytes(pcm_bytes, sample_rate=16000, channels=1):
+    """
+    Đóng gói PCM 16-bit thành luồng byte wav, không cần qua mã hóa/giải mã opus
+    """
     wav_buffer = BytesIO()
     with wave.open(wav_buffer, "wb") as wf:
         wf.setnchannels(channels)
@@ -376,49 +439,46 @@ def opus_datas_to_wav_bytes(opus_datas, sample_rate=16000, channels=1):
 
 
 def check_vad_update(before_config, new_config):
-    if (
-        new_config.get("selected_module") is None
-        or new_config["selected_module"].get("VAD") is None
-    ):
+    # Cùng một đối tượng cấu hình thì chắc chắn không thay đổi
+    if before_config is new_config:
+        return False
+    new_selected = new_config.get("selected_module")
+    if new_selected is None or new_selected.get("VAD") is None:
         return False
-    update_vad = False
     current_vad_module = before_config["selected_module"]["VAD"]
-    new_vad_module = new_config["selected_module"]["VAD"]
-    current_vad_type = (
-        current_vad_module
-        if "type" not in before_config["VAD"][current_vad_module]
-        else before_config["VAD"][current_vad_module]["type"]
-    )
-    new_vad_type = (
-        new_vad_module
-        if "type" not in new_config["VAD"][new_vad_module]
-        else new_config["VAD"][new_vad_module]["type"]
+    new_vad_module = new_selected["VAD"]
+    current_vad_type = before_config["VAD"][current_vad_module].get(
+        "type", current_vad_module
     )
-    update_vad = current_vad_type != new_vad_type
-    return update_vad
+    new_vad_type = new_config["VAD"][new_vad_module].get("type", new_vad_module)
+    return current_vad_type != new_vad_type
 
 
 def check_asr_update(before_config, new_config):
-    if (
-        new_config.get("selected_module") is None
-        or new_config["selected_module"].get("ASR") is None
-    ):
+    # Cùng một đối tượng cấu hình thì chắc chắn không thay đổi
+    if before_config is new_config:
+        return False
+    new_selected = new_config.get("selected_module")
+    if new_selected is None or new_selected.get("ASR") is None:
         return False
-    update_asr = False
     current_asr_module = before_config["selected_module"]["ASR"]
-    new_asr_module = new_config["selected_module"]["ASR"]
-    current_asr_type = (
-        current_asr_module
-        if "type" not in before_config["ASR"][current_asr_module]
-        else before_config["ASR"][current_asr_module]["type"]
-    )
-    new_asr_type = (
-        new_asr_module
-        if "type" not in new_config["ASR"][new_asr_module]
-        else new_config["ASR"][new_asr_module]["type"]
+    new_asr_module = new_selected["ASR"]
+    current_asr_type = before_config["ASR"][current_asr_module].get(
+        "type", current_asr_module
     )
-    update_asr = current_asr_type != new_asr_type
-    return update_asr
+    new_asr_type = new_config["ASR"][new_asr_module].get("type", new_asr_module)
+    return current_asr_type != new_asr_type
+
+
+_SENSITIVE_KEYS = (
+    "api_key",
+    "personal_access_token",
+    "access_token",
+    "token",
+    "secret",
+    "access_key_secret",
+    "secret_key",
+)
 
 
 def filter_sensitive_info(config: dict) -> dict:
@@ -429,30 +489,26 @@ def filter_sensitive_info(config: dict) -> dict:
     Returns:
         Từ điển cấu hình sau lọc
     """
-    sensitive_keys = [
-        "api_key",
-        "personal_access_token",
-        "access_token",
-        "token",
-        "secret",
-        "access_key_secret",
-        "secret_key",
-    ]
+
+    # Dict/list luôn được tạo mới khi duyệt nên không cần deepcopy cấu hình gốc
+    def _filter_value(v):
+        if isinstance(v, dict):
+            return _filter_dict(v)
+        if isinstance(v, list):
+            return [_filter_value(i) for i in v]
+        return v
 
     def _filter_dict(d: dict) -> dict:
         filtered = {}
         for k, v in d.items():
-            if any(sensitive in k.lower() for sensitive in sensitive_keys):
+            k_lower = k.lower()
+            if any(sensitive in k_lower for sensitive in _SENSITIVE_KEYS):
                 filtered[k] = "***"
-            elif isinstance(v, dict):
-                filtered[k] = _filter_dict(v)
-            elif isinstance(v, list):
-                filtered[k] = [_filter_dict(i) if isinstance(i, dict) else i for i in v]
             else:
-                filtered[k] = v
+                filtered[k] = _filter_value(v)
         return filtered
 
-    return _filter_dict(copy.deepcopy(config))
+    return _filter_dict(config)
 
 
 def get_vision_url(config: dict) -> str:
@@ -473,6 +529,19 @@ def get_vision_url(config: dict) -> str:
     return vision_explain
 
 
+# Magic number (header) của các định dạng ảnh phổ biến, nhóm theo byte đầu tiên
+# để chỉ cần một lần tra dict thay vì so với toàn bộ danh sách
+_IMAGE_SIGNATURES_BY_FIRST_BYTE = {
+    0xFF: (b"\xff\xd8\xff",),  # JPEG
+    0x89: (b"\x89PNG\r\n\x1a\n",),  # PNG
+    0x47: (b"GIF87a", b"GIF89a"),  # GIF
+    0x42: (b"BM",),  # BMP
+    0x49: (b"II*\x00",),  # TIFF
+    0x4D: (b"MM\x00*",),  # TIFF
+    0x52: (b"RIFF",),  # WEBP
+}
+
+
 def is_valid_image_file(file_data: bytes) -> bool:
     """
     Kiểm tra dữ liệu tệp có phải định dạng ảnh hợp lệ hay không
@@ -483,20 +552,11 @@ def is_valid_image_file(file_data: bytes) -> bool:
     Returns:
         bool: Trả về True nếu là định dạng ảnh hợp lệ, nếu không trả về False
     """
-    # Magic number (header) của các định dạng ảnh phổ biến
-    image_signatures = {
-        b"\xff\xd8\xff": "JPEG",
-        b"\x89PNG\r\n\x1a\n": "PNG",
-        b"GIF87a": "GIF",
-        b"GIF89a": "GIF",
-        b"BM": "BMP",
-        b"II*\x00": "TIFF",
-        b"MM\x00*": "TIFF",
-        b"RIFF": "WEBP",
-    }
-
-    # Kiểm tra xem header có khớp với định dạng ảnh đã biết hay không
-    for signature in image_signatures:
+    if not file_data:
+        return False
+
+    # Chỉ so với các magic number có cùng byte đầu tiên
+    for signature in _IMAGE_SIGNATURES_BY_FIRST_BYTE.get(file_data[0], ()):
         if file_data.startswith(signature):
             return True
 
@@ -506,7 +566,7 @@ def is_valid_image_file(file_data: bytes) -> bool:
 def sanitize_tool_name(name: str) -> str:
     """Sanitize tool names for OpenAI compatibility."""
     # Hỗ trợ ký tự tiếng Trung, chữ cái, số, gạch dưới và gạch nối
-    return re.sub(r"[^a-zA-Z0-9_\-\u4e00-\u9fff]", "_", name)
+    return _TOOL_NAME_RE.sub("_", name)
 
 
 def validate_mcp_endpoint(mcp_endpoint: str) -> bool:
@@ -523,8 +583,9 @@ def validate_mcp_endpoint(mcp_endpoint: str) -> bool:
     if not mcp_endpoint.startswith("ws"):
         return False
 
-    # 2. Kiểm tra có chứa từ key hoặc call hay không
-    if "key" in mcp_endpoint.lower() or "call" in mcp_endpoint.lower():
+    # 2. Kiểm tra có chứa từ key hoặc call hay không (chỉ chuyển chữ thường một lần)
+    lowered = mcp_endpoint.lower()
+    if "key" in lowered or "call" in lowered:
         return False
 
     # 3. Kiểm tra có chứa chuỗi /mcp/ hay không
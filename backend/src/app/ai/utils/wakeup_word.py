@@ -4,9 +4,25 @@ import yaml
 import time
 import hashlib
 import portalocker
+from functools import lru_cache
 from typing import Dict
 from app.ai.utils.paths import get_wakeup_words_config_file, get_wakeup_words_dir
 
+# Ưu tiên loader/dumper viết bằng C (LibYAML), nếu không có thì dùng bản thuần Python
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - phụ thuộc môi trường
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
+# Emoji cần lọc khỏi văn bản phản hồi
+_EMOJI_RE = re.compile(r"[\U0001F600-\U0001F64F\U0001F900-\U0001F9FF]")
+
+
+@lru_cache(maxsize=512)
+def _voice_hash(voice: str) -> str:
+    """Giá trị băm MD5 của voice, dùng làm khóa cấu hình và tên tệp âm thanh"""
+    return hashlib.md5(voice.encode()).hexdigest()
+
 
 class FileLock:
     def __init__(self, file, timeout=5):
@@ -36,8 +52,8 @@ class WakeupWordsConfig:
         self.assets_dir = str(get_wakeup_words_dir())
         self._ensure_directories()
         self._config_cache = None
-        self._last_load_time = 0
-        self._cache_ttl = 1  # Thời gian sống của bộ nhớ đệm (giây)
+        # (mtime_ns, size) của file khi nạp bộ nhớ đệm, dùng để phát hiện thay đổi
+        self._cached_file_version = None
         self._lock_timeout = 5  # Thời gian chờ khóa tệp (giây)
 
     def _ensure_directories(self):
@@ -46,11 +62,18 @@ class WakeupWordsConfig:
         os.makedirs(self.assets_dir, exist_ok=True)
 
     def _load_config(self) -> Dict:
-        """Tải file cấu hình với cơ chế bộ nhớ đệm"""
-        current_time = time.time()
-
-        # Nếu bộ nhớ đệm còn hiệu lực thì trả về ngay
-        if self._config_cache is not None and current_time - self._last_load_time < self._cache_ttl:
+        """Tải file cấu hình với cơ chế bộ nhớ đệm (chỉ đọc lại khi file thay đổi)"""
+        # File chưa thay đổi kể từ lần nạp trước thì trả về ngay, không cần mở/khóa file
+        try:
+            st = os.stat(self.config_file)
+            file_version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            file_version = None
+        if (
+            self._config_cache is not None
+            and file_version is not None
+            and file_version == self._cached_file_version
+        ):
             return self._config_cache
 
         try:
@@ -58,9 +81,10 @@ class WakeupWordsConfig:
                 with FileLock(f, timeout=self._lock_timeout):
                     f.seek(0)
                     content = f.read()
-                    config = yaml.safe_load(content) if content else {}
+                    config = yaml.load(content, Loader=_YamlLoader) if content else {}
+                    st = os.fstat(f.fileno())
                     self._config_cache = config
-                    self._last_load_time = current_time
+                    self._cached_file_version = (st.st_mtime_ns, st.st_size)
                     return config
         except (TimeoutError, IOError) as e:
             print(f"Tải file cấu hình thất bại: {e}")
@@ -74,9 +98,11 @@ class WakeupWordsConfig:
         try:
             with open(self.config_file, "w", encoding="utf-8") as f:
                 with FileLock(f, timeout=self._lock_timeout):
-                    yaml.dump(config, f, allow_unicode=True)
+                    yaml.dump(config, f, Dumper=_YamlDumper, allow_unicode=True)
+                    f.flush()
+                    st = os.fstat(f.fileno())
                     self._config_cache = config
-                    self._last_load_time = time.time()
+                    self._cached_file_version = (st.st_mtime_ns, st.st_size)
         except (TimeoutError, IOError) as e:
             print(f"Lưu file cấu hình thất bại: {e}")
             raise
@@ -85,8 +111,8 @@ class WakeupWordsConfig:
             raise
 
     def get_wakeup_response(self, voice: str) -> Dict:
-        voice = hashlib.md5(voice.encode()).hexdigest()
         """Lấy cấu hình phản hồi từ khóa đánh thức"""
+        voice = _voice_hash(voice)
         config = self._load_config()
 
         if not config or voice not in config:
@@ -103,10 +129,10 @@ class WakeupWordsConfig:
         """Cập nhật cấu hình phản hồi từ khóa đánh thức"""
         try:
             # Lọc bỏ emoji
-            filtered_text = re.sub(r"[\U0001F600-\U0001F64F\U0001F900-\U0001F9FF]", "", text)
+            filtered_text = _EMOJI_RE.sub("", text)
 
             config = self._load_config()
-            voice_hash = hashlib.md5(voice.encode()).hexdigest()
+            voice_hash = _voice_hash(voice)
             config[voice_hash] = {
                 "voice": voice,
                 "file_path": file_path,
@@ -122,7 +148,7 @@ class WakeupWordsConfig:
         """Tạo đường dẫn tệp âm thanh, dùng giá trị băm của voice làm tên tệp"""
         try:
             # Tạo giá trị băm của voice
-            voice_hash = hashlib.md5(voice.encode()).hexdigest()
+            voice_hash = _voice_hash(voice)
             file_path = os.path.join(self.assets_dir, f"{voice_hash}.wav")
 
             # Nếu tệp đã tồn tại thì xóa trước
@@ -6,15 +6,16 @@ from redis.asyncio import Redis
 
 from app.config import Settings
 from app.core.auth import AuthManager
-from app.services import ThreadPoolService
+from app.services import AppServices, ThreadPoolService
 from ..core.db.database import async_get_db
 from ..core.exceptions.http_exceptions import (
     ForbiddenException,
     UnauthorizedException,
 )
 from ..core.logger import get_logger
-from ..core.security import TokenType, oauth2_scheme, verify_token
-from ..core.utils import BaseCacheManager, get_cache_manager
+from ..core.security import TokenType, decode_token, oauth2_scheme
+from ..core.utils import BaseCacheManager, RedisCacheManager, get_cache_manager
+from ..core.utils import cache as redis_cache
 from ..crud.crud_users import crud_users
 from ..crud.crud_device import crud_device
 from ..services.agent_service import agent_service
@@ -23,36 +24,44 @@ from ..services.agent_service import agent_service
 logger = get_logger(__name__)
 
 
-async def get_settings(request: Request) -> Settings:
-    """Lấy cấu hình ứng dụng từ app state."""
-    config = getattr(request.app.state, "config", None)
-    if config is None:
+async def get_services(request: Request) -> AppServices:
+    """Lấy container tài nguyên dùng chung, dùng khi endpoint cần nhiều tài nguyên một lúc.
+
+    Raises:
+        HTTPException: Nếu container tài nguyên chưa được khởi tạo
+    """
+    services = getattr(request.app.state, "services", None)
+    if services is None:
         raise HTTPException(
             status_code=503,
-            detail="Settings not initialized",
+            detail="App services not initialized",
         )
-    return config
+    return services
 
 
-async def get_thread_pool(request: Request) -> ThreadPoolService:
+async def get_settings(
+    services: Annotated[AppServices, Depends(get_services)],
+) -> Settings:
+    """Lấy cấu hình ứng dụng từ app state."""
+    return services.config
+
+
+async def get_thread_pool(
+    services: Annotated[AppServices, Depends(get_services)],
+) -> ThreadPoolService:
     """Lấy thread pool dùng cho tác vụ blocking."""
-    thread_pool = getattr(request.app.state, "thread_pool", None)
-    if thread_pool is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Thread pool not initialized",
-        )
-    return thread_pool
+    return services.thread_pool
 
 
-async def get_redis_client(request: Request) -> Redis:
+async def get_redis_client(
+    services: Annotated[AppServices, Depends(get_services)],
+) -> Redis:
     """Lấy Redis client từ cache pool.
 
     Raises:
         HTTPException: Nếu Redis client chưa được khởi tạo
     """
-    from app.core.utils.cache import client as redis_client
-
+    redis_client = services.redis
     if redis_client is None:
         raise HTTPException(
             status_code=503,
@@ -61,71 +70,99 @@ async def get_redis_client(request: Request) -> Redis:
     return redis_client
 
 
-async def get_modules(request: Request) -> dict[str, Any]:
+async def get_modules(
+    services: Annotated[AppServices, Depends(get_services)],
+) -> dict[str, Any]:
     """Lấy các mô-đun đã khởi tạo (VAD, ASR, LLM, ...)."""
-    modules = getattr(request.app.state, "modules", None)
-    if modules is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Modules not initialized",
-        )
-    return modules
+    return services.modules
 
 
 async def get_device_id(request: Request) -> str:
     """Đọc device-id từ header yêu cầu."""
-    device_id = request.headers.get("device-id")
+    # Đọc thẳng từ scope ASGI (tên header đã ở dạng chữ thường),
+    # không cần dựng đối tượng Headers chỉ để lấy một header
+    device_id = None
+    for name, value in request.scope["headers"]:
+        if name == b"device-id":
+            device_id = value.decode("latin-1")
+            break
     if not device_id:
         raise HTTPException(status_code=400, detail="Missing device-id header")
     return device_id
 
 
+def get_websocket_services(websocket: WebSocket) -> AppServices:
+    """Lấy container tài nguyên dùng chung (config, thread pool, modules, auth)."""
+    try:
+        return websocket.app.state.services
+    except AttributeError:
+        raise RuntimeError("App services not initialized") from None
+
+
 def get_websocket_settings(websocket: WebSocket) -> Settings:
     """Lấy cấu hình từ state trong WebSocket."""
-    if not hasattr(websocket.app.state, "config"):
-        raise RuntimeError("Settings not initialized")
-    return websocket.app.state.config
+    return get_websocket_services(websocket).config
 
 
 def get_websocket_thread_pool(websocket: WebSocket) -> ThreadPoolService:
     """Lấy thread pool từ WebSocket state."""
-    if not hasattr(websocket.app.state, "thread_pool"):
-        raise RuntimeError("Thread pool not initialized")
-    return websocket.app.state.thread_pool
+    return get_websocket_services(websocket).thread_pool
 
 
 def get_websocket_modules(websocket: WebSocket) -> dict[str, Any]:
     """Lấy các mô-đun đã khởi tạo từ WebSocket state."""
-    if not hasattr(websocket.app.state, "modules"):
-        raise RuntimeError("Modules not initialized")
-    return websocket.app.state.modules
+    return get_websocket_services(websocket).modules
 
 
 def get_websocket_auth_manager(websocket: WebSocket) -> AuthManager | None:
     """Lấy AuthManager đang được bật (nếu có)."""
-    return getattr(websocket.app.state, "auth_manager", None)
+    return get_websocket_services(websocket).auth_manager
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(async_get_db)],
+async def _authenticate_token(
+    request: Request, token: str, db: AsyncSession
 ) -> dict[str, Any] | None:
-    token_data = await verify_token(token, TokenType.ACCESS, db)
+    """Xác thực access token và lấy user tương ứng.
+
+    Kết quả được ghi nhớ trên ``request.state`` nên khi cả ``get_current_user``
+    và ``get_optional_user`` cùng được resolve trong một request, token chỉ được
+    kiểm tra và user chỉ được truy vấn một lần.
+    """
+    cached = getattr(request.state, "auth_user", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    # Kiểm tra chữ ký/hạn token cục bộ, không cần DB
+    token_data = decode_token(token, TokenType.ACCESS)
     if token_data is None:
-        raise UnauthorizedException("User not authenticated.")
+        return None
 
-    # Token now contains email in username_or_email field
-    user = await crud_users.get(
-        db=db, email=token_data.username_or_email, is_deleted=False
+    # Token now contains email in username_or_email field.
+    # Kiểm tra blacklist và lấy user trong cùng một truy vấn
+    owns_transaction = not db.in_transaction()
+    user = await crud_users.get_by_valid_token(
+        db=db, email=token_data.username_or_email, token=token
     )
+    if owns_transaction:
+        # Kết thúc transaction chỉ-đọc của bước xác thực để trả kết nối về pool ngay,
+        # không giữ kết nối suốt thời gian xử lý endpoint (session vẫn dùng tiếp được)
+        await db.commit()
+    if user is None:
+        return None
 
-    if user:
-        if hasattr(user, "model_dump"):
-            return user.model_dump()
-        else:
-            return user
+    request.state.auth_user = (token, user)
+    return user
 
-    raise UnauthorizedException("User not authenticated.")
+
+async def get_current_user(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any] | None:
+    user = await _authenticate_token(request, token, db)
+    if user is None:
+        raise UnauthorizedException("User not authenticated.")
+    return user
 
 
 async def get_optional_user(
@@ -136,15 +173,16 @@ async def get_optional_user(
         return None
 
     try:
-        token_type, _, token_value = token.partition(" ")
-        if token_type.lower() != "bearer" or not token_value:
+        # Trường hợp thường gặp chỉ cần một phép so sánh tiền tố, không tách chuỗi
+        if not token.startswith(("Bearer ", "bearer ")) and (
+            token[6:7] != " " or token[:6].lower() != "bearer"
+        ):
             return None
-
-        token_data = await verify_token(token_value, TokenType.ACCESS, db)
-        if token_data is None:
+        token_value = token[7:]
+        if not token_value:
             return None
 
-        return await get_current_user(token_value, db=db)
+        return await _authenticate_token(request, token_value, db)
 
     except HTTPException as http_exc:
         if http_exc.status_code != 401:
@@ -167,6 +205,9 @@ async def get_current_superuser(
     return current_user
 
 
+_cache_manager: RedisCacheManager | None = None
+
+
 async def get_cache_manager_dependency() -> BaseCacheManager:
     """
     Get cache manager instance for async FastAPI dependency injection.
@@ -179,7 +220,13 @@ async def get_cache_manager_dependency() -> BaseCacheManager:
     Raises:
         MissingClientError: If Redis client is not initialized
     """
-    return get_cache_manager()
+    global _cache_manager
+    # The manager is stateless apart from its Redis client, so one instance is
+    # reused per worker; it is rebuilt if the client is recreated (lifespan restart).
+    manager = _cache_manager
+    if manager is None or manager.redis is not redis_cache.client:
+        manager = _cache_manager = get_cache_manager()
+    return manager
 
 
 def get_agent_service_dependency():
@@ -1,41 +1,30 @@
+import importlib
+
 from fastapi import APIRouter
 
-from .auth import router as auth_router
-from .health import router as health_router
-from .reminder import router as reminder_router, reminder_detail_router
-from .users import router as users_router
-from .ota import router as ota_router
-from .vision import router as vision_router
-from .websocket import router as websocket_router
-from .agent import router as agent_router
-from .template import router as template_router
-from .config import router as config_router
-from .providers import router as providers_router
-from .tools import router as tools_router
-from .embeddings import router as embeddings_router
-from .knowledge_base import router as knowledge_base_router
-from .mcp_configs import router as mcp_configs_router
-from .agent_mcp import router as agent_mcp_router
-from .system_mcp import router as system_mcp_router
+# (module, các router được export) theo đúng thứ tự đăng ký route
+ROUTERS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("health", ("router",)),
+    ("auth", ("router",)),
+    ("users", ("router",)),
+    ("reminder", ("router", "reminder_detail_router")),
+    ("ota", ("router",)),
+    ("vision", ("router",)),
+    ("websocket", ("router",)),
+    ("agent", ("router",)),
+    ("agent_mcp", ("router",)),
+    ("template", ("router",)),
+    ("config", ("router",)),
+    ("providers", ("router",)),
+    ("tools", ("router",)),
+    ("embeddings", ("router",)),
+    ("knowledge_base", ("router",)),
+    ("mcp_configs", ("router",)),
+    ("system_mcp", ("router",)),
+)
 
 router = APIRouter(prefix="/v1")
-router.include_router(health_router)
-router.include_router(auth_router)
-router.include_router(users_router)
-
-router.include_router(reminder_router)
-router.include_router(reminder_detail_router)
-
-router.include_router(ota_router)
-router.include_router(vision_router)
-router.include_router(websocket_router)
-router.include_router(agent_router)
-router.include_router(agent_mcp_router)
-router.include_router(template_router)
-router.include_router(config_router)
-router.include_router(providers_router)
-router.include_router(tools_router)
-router.include_router(embeddings_router)
-router.include_router(knowledge_base_router)
-router.include_router(mcp_configs_router)
-router.include_router(system_mcp_router)
+for _module_name, _attrs in ROUTERS:
+    _module = importlib.import_module(f".{_module_name}", __name__)
+    for _attr in _attrs:
+        router.include_router(getattr(_module, _attr))
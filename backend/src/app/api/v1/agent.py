@@ -50,10 +50,7 @@ from ...schemas.agent import (
     AgentWebhookRead,
     WebhookNotificationPayload,
 )
-from ...schemas.template import (
-    TemplateRead,
-    TemplateWithProvidersRead,
-)
+from ...schemas.template import TemplateWithProvidersRead
 from ...schemas.device import DeviceRead
 from ...schemas.agent_template_assignment import AssignmentRead
 from ...ai.module_factory import parse_provider_reference
@@ -157,18 +154,17 @@ async def _enrich_templates_with_providers(
                             config_providers[field] = set()
                         config_providers[field].add(value)
 
-    # Batch fetch all db providers
+    # Batch fetch all db providers (một truy vấn IN thay vì một truy vấn mỗi provider)
     db_providers_map: dict[str, dict] = {}
-    for provider_id in db_provider_ids:
-        provider = await crud_provider.get(db=db, id=provider_id, is_deleted=False)
-        if provider:
-            db_providers_map[provider_id] = {
-                "reference": f"db:{provider.get('id')}",
-                "id": provider.get("id"),
-                "name": provider.get("name"),
-                "type": provider.get("type"),
-                "source": "user",
-            }
+    providers = await crud_provider.get_multi_by_ids(db=db, ids=list(db_provider_ids))
+    for provider in providers:
+        db_providers_map[provider.get("id")] = {
+            "reference": f"db:{provider.get('id')}",
+            "id": provider.get("id"),
+            "name": provider.get("name"),
+            "type": provider.get("type"),
+            "source": "user",
+        }
 
     # Load config if needed
     if config_providers:
@@ -653,17 +649,20 @@ async def get_agent_templates(
             limit=page_size,
         )
 
-        templates = []
-        for assignment in assignments.get("data", []):
-            template = await crud_template.get(
+        # Lấy toàn bộ template của trang trong một truy vấn, giữ thứ tự của assignment
+        assignment_list = assignments.get("data", [])
+        templates_by_id = {
+            template.id: template
+            for template in await crud_template.get_multi_by_ids(
                 db=db,
-                id=assignment.template_id,
-                is_deleted=False,
-                schema_to_select=TemplateRead,
-                return_as_model=True,
+                ids=[assignment.template_id for assignment in assignment_list],
             )
-            if template:
-                templates.append(template)
+        }
+        templates = [
+            templates_by_id[assignment.template_id]
+            for assignment in assignment_list
+            if assignment.template_id in templates_by_id
+        ]
 
         total = assignments.get("total_count", 0)
         total_pages = (total + page_size - 1) // page_size
@@ -296,7 +296,7 @@ async def get_runtime_config(
     - Truyền include_sensitive=true để xem đầy đủ
     """
     try:
-        settings: Settings = request.app.state.config
+        settings: Settings = request.app.state.services.config
         config_dict = settings.to_dict()
 
         if not include_sensitive:
@@ -346,7 +346,7 @@ async def update_runtime_config(
     """
     try:
         # 1. Get current settings
-        settings: Settings = request.app.state.config
+        settings: Settings = request.app.state.services.config
         current_config = settings.to_dict()
 
         # 2. Convert update to dict (exclude None values)
@@ -372,7 +372,7 @@ async def update_runtime_config(
             )
 
         # 5. Update runtime config
-        request.app.state.config = new_settings
+        request.app.state.services.config = new_settings
 
         # 6. Invalidate global cache để load_config() trả về merged config
         with _config_loader_module._CACHE_LOCK:
@@ -428,7 +428,7 @@ async def reload_config_from_files(
         new_settings = Settings.from_dict(raw_config)
 
         # Update runtime
-        request.app.state.config = new_settings
+        request.app.state.services.config = new_settings
 
         LOGGER.info(
             f"[Admin Config] User {current_user.get('email')} reloaded config from files"
@@ -6,8 +6,8 @@ from typing import Optional, Tuple
 from fastapi import APIRouter, Depends, Header, Request
 from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from app.config import Settings
-from app.services import ThreadPoolService
-from app.api.dependencies import get_settings, get_thread_pool
+from app.services import AppServices
+from app.api.dependencies import get_services, get_settings
 from app.ai.utils.auth import AuthToken
 from app.ai.utils.util import get_vision_url, is_valid_image_file
 from app.ai.plugins_func.register import Action
@@ -86,15 +86,14 @@ async def vision_post(
     device_id: str = Header(..., alias="Device-Id"),
     client_id: str = Header(..., alias="Client-Id"),
     authorization: str = Header(..., alias="Authorization"),
-    settings: Settings = Depends(get_settings),
-    thread_pool: ThreadPoolService = Depends(get_thread_pool),
+    services: AppServices = Depends(get_services),
 ):
     """
     Vision POST - Analyzes image with question (legacy-compatible)
     """
     response: Response
     try:
-        config = settings.to_dict()
+        config = services.config.to_dict()
         secret_key = config.get("server", {}).get("auth_key", "")
         auth = AuthToken(secret_key)
 
@@ -165,7 +164,7 @@ async def vision_post(
             vllm = create_instance(vllm_type, vllm_config)
             return vllm.response(question, image_base64)
 
-        result = await thread_pool.run_blocking(_analyze_vision_sync)
+        result = await services.thread_pool.run_blocking(_analyze_vision_sync)
 
         return_json = {
             "success": True,
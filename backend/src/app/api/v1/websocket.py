@@ -13,9 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.ai.connection import ConnectionHandler
 from app.ai.utils import AuthToken
 from app.api.dependencies import (
-    get_websocket_settings,
-    get_websocket_thread_pool,
-    get_websocket_modules,
+    get_websocket_services,
     get_agent_service_dependency,
 )
 from app.core.db.database import async_get_db
@@ -175,9 +173,11 @@ async def _load_app_state(websocket: WebSocket, device_id: str):
     logger = setup_logging()
 
     try:
-        settings = get_websocket_settings(websocket)
-        thread_pool = get_websocket_thread_pool(websocket)
-        modules = get_websocket_modules(websocket)
+        # Đọc container một lần; config luôn là bản mới nhất (có thể reload lúc runtime)
+        services = get_websocket_services(websocket)
+        settings = services.config
+        thread_pool = services.thread_pool
+        modules = services.modules
         agent_service = get_agent_service_dependency()
 
         db = async_get_db()
@@ -142,10 +142,37 @@ async def verify_token(
     TokenData | None
         TokenData instance if the token is valid, None otherwise.
     """
+    # Decode locally first so malformed, expired or wrong-type tokens never hit the DB
+    token_data = decode_token(token, expected_token_type)
+    if token_data is None:
+        return None
+
     is_blacklisted = await crud_token_blacklist.exists(db, token=token)
     if is_blacklisted:
         return None
 
+    return token_data
+
+
+def decode_token(token: str, expected_token_type: TokenType) -> TokenData | None:
+    """Decode a JWT token locally, without the database blacklist check.
+
+    Callers must check the blacklist themselves, either through
+    ``verify_token`` or in the same query that loads the user
+    (``crud_users.get_by_valid_token``).
+
+    Parameters
+    ----------
+    token: str
+        The JWT token to be decoded.
+    expected_token_type: TokenType
+        The expected type of token (access or refresh)
+
+    Returns
+    -------
+    TokenData | None
+        TokenData instance if the signature, expiry and token type are valid, None otherwise.
+    """
     try:
         payload = jwt.decode(
             token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM]
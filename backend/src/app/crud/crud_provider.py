@@ -2,7 +2,11 @@
 CRUD operations for Provider model.
 """
 
+from typing import Any
+
 from fastcrud import FastCRUD
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.provider import Provider
 from ..schemas.provider import (
@@ -13,13 +17,41 @@ from ..schemas.provider import (
     ProviderUpdateInternal,
 )
 
-CRUDProvider = FastCRUD[
-    Provider,
-    ProviderCreateInternal,
-    ProviderUpdate,
-    ProviderUpdateInternal,
-    ProviderDelete,
-    ProviderRead,
-]
-crud_provider = CRUDProvider(Provider)
 
+class CRUDProvider(
+    FastCRUD[
+        Provider,
+        ProviderCreateInternal,
+        ProviderUpdate,
+        ProviderUpdateInternal,
+        ProviderDelete,
+        ProviderRead,
+    ]
+):
+    """CRUD operations for Provider model with custom methods."""
+
+    async def get_multi_by_ids(
+        self, db: AsyncSession, ids: list[str]
+    ) -> list[dict[str, Any]]:
+        """
+        Get non-deleted providers by a list of IDs in a single query.
+
+        Args:
+            db: AsyncSession
+            ids: Provider UUIDs
+
+        Returns:
+            list[dict]: Provider rows (same shape as ``get``), in no particular order
+        """
+        if not ids:
+            return []
+
+        stmt = select(*Provider.__table__.columns).where(
+            Provider.id.in_(ids),
+            Provider.is_deleted == False,
+        )
+        result = await db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+
+crud_provider = CRUDProvider(Provider)
@@ -6,6 +6,7 @@ Methods:
 - get_agents_using_template: List agents assigned to a template
 - get_with_validation: Get template with ownership verification
 - can_access_template: Check if user can access template (owner or public)
+- get_multi_by_ids: Get templates by a list of IDs in one query
 """
 
 from fastcrud import FastCRUD
@@ -323,5 +324,35 @@ class CRUDTemplate(
             logger.error(f"Failed to check template modify access: {str(e)}")
             return False
 
+    async def get_multi_by_ids(
+        self,
+        db: AsyncSession,
+        ids: list[str],
+    ) -> list[TemplateRead]:
+        """
+        Get non-deleted templates by a list of IDs in a single query.
+
+        Args:
+            db: AsyncSession
+            ids: Template UUIDs
+
+        Returns:
+            list[TemplateRead]: Templates found, in no particular order
+        """
+        if not ids:
+            return []
+
+        from sqlalchemy import select
+
+        stmt = select(Template).where(
+            Template.id.in_(ids),
+            Template.is_deleted == False,
+        )
+        result = await db.execute(stmt)
+        return [
+            TemplateRead.model_validate(t, from_attributes=True)
+            for t in result.scalars().all()
+        ]
+
 
 crud_template = CRUDTemplate(Template)
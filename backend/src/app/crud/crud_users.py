@@ -1,7 +1,35 @@
+from typing import Any
+
 from fastcrud import FastCRUD
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.db.token_blacklist import TokenBlacklist
 from ..models.user import User
 from ..schemas.user import UserCreateInternal, UserDelete, UserRead, UserUpdate, UserUpdateInternal
 
-CRUDUser = FastCRUD[User, UserCreateInternal, UserUpdate, UserUpdateInternal, UserDelete, UserRead]
+
+class CRUDUser(FastCRUD[User, UserCreateInternal, UserUpdate, UserUpdateInternal, UserDelete, UserRead]):
+
+    async def get_by_valid_token(
+        self, db: AsyncSession, email: str, token: str
+    ) -> dict[str, Any] | None:
+        """Lấy user (chưa bị xóa) theo email, kèm kiểm tra token chưa bị thu hồi.
+
+        Gộp kiểm tra blacklist và truy vấn user vào một câu SQL (một round-trip).
+        Trả về None nếu không có user hoặc token đã nằm trong blacklist.
+        """
+        is_blacklisted = exists().where(TokenBlacklist.token == token).label("is_blacklisted")
+        stmt = select(*User.__table__.columns, is_blacklisted).where(
+            User.email == email, User.is_deleted.is_(False)
+        )
+        row = (await db.execute(stmt)).mappings().first()
+        if row is None or row["is_blacklisted"]:
+            return None
+
+        user = dict(row)
+        del user["is_blacklisted"]
+        return user
+
+
 crud_users = CRUDUser(User)
@@ -11,9 +11,17 @@ from .core.auth import AuthManager
 from .core.config import settings
 from .core.logger import setup_logging
 from .ai.module_factory import initialize_modules
+from .ai.utils.util import close_http_client
 from .core.setup import create_application, lifespan_factory
 from .core.uvicorn_config import setup_uvicorn_logging
-from .services import ThreadPoolService, ReminderService, scheduler_service, MQTTService
+from .core.utils import cache
+from .services import (
+    AppServices,
+    ThreadPoolService,
+    ReminderService,
+    scheduler_service,
+    MQTTService,
+)
 
 # Thiết lập logging từ đầu
 setup_logging()
@@ -26,26 +34,29 @@ async def startup_realtime_components(app: FastAPI) -> None:
 
     raw_config = load_config()
     module_settings = Settings.from_dict(raw_config)
-    app.state.config = module_settings
 
     max_workers = raw_config.get("thread_pool", {}).get("max_workers", 10)
-    app.state.thread_pool = ThreadPoolService(max_workers=max_workers)
+    # Gắn container một lần, dependency chỉ đọc thuộc tính (không cần kiểm tra None)
+    services = AppServices(
+        config=module_settings,
+        thread_pool=ThreadPoolService(max_workers=max_workers),
+        redis=cache.client,
+    )
+    app.state.services = services
     app.state.active_connections = set()
-    app.state.modules = {}
-    app.state.auth_manager = None
     app.state.reminder_service = None
     app.state.mqtt_service = None
 
     if module_settings.auth.enabled:
         try:
-            app.state.auth_manager = AuthManager(
+            services.auth_manager = AuthManager(
                 secret_key=module_settings.server.auth_key,
                 expire_seconds=module_settings.auth.expire_seconds,
             )
             logger.info("[Startup] AuthManager initialized (auth enabled)")
         except Exception as exc:
             logger.warning(f"[Startup] Failed to initialize AuthManager: {exc}")
-            app.state.auth_manager = None
+            services.auth_manager = None
     else:
         logger.debug("[Startup] Auth disabled")
 
@@ -64,15 +75,15 @@ async def startup_realtime_components(app: FastAPI) -> None:
 
     try:
         modules = await initialize_modules(
-            thread_pool=app.state.thread_pool,
+            thread_pool=services.thread_pool,
             config=module_settings,
         )
-        app.state.modules = modules
+        services.modules = modules
         logger.info(f"[Startup] Modules initialized: {list(modules.keys())}")
     except Exception as exc:
         logger.error(f"[Startup] Module initialization failed: {exc}")
         traceback.print_exc()
-        app.state.modules = {}
+        services.modules = {}
 
     try:
         reminder_service = ReminderService(
@@ -101,8 +112,9 @@ async def shutdown_realtime_components(app: FastAPI) -> None:
     """Giải phóng tài nguyên realtime khi shutdown."""
     logger = setup_logging().bind(tag=__name__)
 
-    modules = getattr(app.state, "modules", {}) or {}
-    thread_pool: ThreadPoolService | None = getattr(app.state, "thread_pool", None)
+    services: AppServices | None = getattr(app.state, "services", None)
+    modules = (services.modules if services else None) or {}
+    thread_pool: ThreadPoolService | None = services.thread_pool if services else None
     reminder_service: ReminderService | None = getattr(
         app.state, "reminder_service", None
     )
@@ -151,6 +163,12 @@ async def shutdown_realtime_components(app: FastAPI) -> None:
         except Exception as exc:
             logger.warning(f"[Shutdown] Error closing module {module_name}: {exc}")
 
+    # Đóng HTTP client dùng chung cho tra cứu IP
+    try:
+        await close_http_client()
+    except Exception as exc:
+        logger.warning(f"[Shutdown] Error closing shared HTTP client: {exc}")
+
     # Shutdown ThreadPool với wait=True để cleanup semaphores
     if thread_pool:
         thread_pool.shutdown(wait=True)
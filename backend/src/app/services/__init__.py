@@ -1,4 +1,5 @@
 from .thread_pool_service import ThreadPoolService
+from .app_services import AppServices
 from .reminder_service import ReminderService
 from .agent_service import AgentService, agent_service
 from .scheduler_service import SchedulerService, scheduler_service
@@ -6,6 +7,7 @@ from .mqtt_service import MQTTService, get_mqtt_service
 
 __all__ = [
     "ThreadPoolService",
+    "AppServices",
     "ReminderService",
     "AgentService",
     "agent_service",
@@ -0,0 +1,28 @@
+"""
+App services - Container cho các tài nguyên dùng chung của ứng dụng
+Được gắn một lần vào app.state.services khi startup, dependency chỉ cần đọc thuộc tính
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from redis.asyncio import Redis
+
+from ..config import Settings
+from ..core.auth import AuthManager
+from .thread_pool_service import ThreadPoolService
+
+
+@dataclass(slots=True)
+class AppServices:
+    """Tài nguyên realtime dùng chung (config, thread pool, Redis, mô-đun AI, auth).
+
+    Không đóng băng (frozen) vì ``config`` có thể được thay thế khi admin cập nhật
+    hoặc reload cấu hình lúc runtime.
+    """
+
+    config: Settings
+    thread_pool: ThreadPoolService
+    redis: Redis | None = None
+    modules: dict[str, Any] = field(default_factory=dict)
+    auth_manager: AuthManager | None = None
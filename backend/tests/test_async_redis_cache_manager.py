@@ -0,0 +1,188 @@
+"""
+Unit tests for AsyncRedisCacheManager's in-process L1 cache and read coalescing.
+
+Redis is replaced by an in-memory fake so these tests need no running server.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app.ai.utils.cache import async_redis_manager
+from app.ai.utils.cache.async_redis_manager import AsyncRedisCacheManager
+from app.ai.utils.cache.config import CacheType
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in that records calls and can hold GETs open"""
+
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+        self.calls: list[str] = []
+        # Khi được đặt, GET chờ sự kiện này rồi mới trả về giá trị đọc lúc gọi
+        self.get_gate: asyncio.Event | None = None
+
+    def put(self, key: str, value) -> None:
+        self.store[key] = json.dumps(value).encode("utf-8")
+
+    async def get(self, key):
+        self.calls.append("get")
+        value = self.store.get(key)
+        if self.get_gate is not None:
+            await self.get_gate.wait()
+        return value
+
+    async def mget(self, keys):
+        self.calls.append("mget")
+        return [self.store.get(k) for k in keys]
+
+    async def set(self, key, value):
+        self.calls.append("set")
+        self.store[key] = value.encode("utf-8")
+
+    async def expire(self, key, ttl):
+        return key in self.store
+
+    async def delete(self, *keys):
+        self.calls.append("delete")
+        return sum(self.store.pop(k, None) is not None for k in keys)
+
+    async def scan(self, cursor, match=None, count=None):
+        prefix = match.rstrip("*")
+        return 0, [k for k in self.store if k.startswith(prefix)]
+
+
+async def _wait_for_call(redis: FakeRedis, name: str) -> None:
+    """Nhường vòng lặp sự kiện cho tới khi fake Redis nhận được lệnh name"""
+    while name not in redis.calls:
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+
+    async def fake_async_get_redis():
+        yield redis
+
+    monkeypatch.setattr(async_redis_manager, "async_get_redis", fake_async_get_redis)
+    return redis
+
+
+@pytest.fixture
+def manager():
+    return AsyncRedisCacheManager()
+
+
+@pytest.mark.unit
+class TestL1Cache:
+    """Reads are served from L1 until a write evicts the entry."""
+
+    async def test_l1_hit_skips_redis(self, manager, fake_redis):
+        fake_redis.put("device:d1", {"online": True})
+
+        assert await manager.get(CacheType.DEVICE, "d1") == {"online": True}
+        assert await manager.get(CacheType.DEVICE, "d1") == {"online": True}
+
+        assert fake_redis.calls.count("get") == 1
+
+    async def test_set_evicts_l1(self, manager, fake_redis):
+        fake_redis.put("device:d1", "old")
+        assert await manager.get(CacheType.DEVICE, "d1") == "old"
+
+        await manager.set(CacheType.DEVICE, "d1", "new")
+
+        assert await manager.get(CacheType.DEVICE, "d1") == "new"
+        assert fake_redis.calls.count("get") == 2
+
+    async def test_delete_evicts_l1(self, manager, fake_redis):
+        fake_redis.put("device:d1", "value")
+        assert await manager.get(CacheType.DEVICE, "d1") == "value"
+
+        assert await manager.delete(CacheType.DEVICE, "d1") is True
+
+        assert await manager.get(CacheType.DEVICE, "d1") is None
+
+    async def test_clear_evicts_l1_for_type_only(self, manager, fake_redis):
+        fake_redis.put("device:d1", "a")
+        fake_redis.put("config:c1", "b")
+        assert await manager.get(CacheType.DEVICE, "d1") == "a"
+        assert await manager.get(CacheType.CONFIG, "c1") == "b"
+
+        await manager.clear(CacheType.DEVICE)
+
+        assert await manager.get(CacheType.DEVICE, "d1") is None
+        # Mục của loại khác vẫn nằm trong L1, không cần gọi lại Redis
+        calls_before = fake_redis.calls.count("get")
+        assert await manager.get(CacheType.CONFIG, "c1") == "b"
+        assert fake_redis.calls.count("get") == calls_before
+
+
+@pytest.mark.unit
+class TestInflightGet:
+    """Concurrent GETs of one key share a single Redis round-trip."""
+
+    async def test_set_during_inflight_get_is_not_overwritten(self, manager, fake_redis):
+        fake_redis.put("device:d1", "old")
+        fake_redis.get_gate = asyncio.Event()
+
+        pending = asyncio.ensure_future(manager.get(CacheType.DEVICE, "d1"))
+        await _wait_for_call(fake_redis, "get")  # GET đã đọc giá trị cũ và đang chờ
+        await manager.set(CacheType.DEVICE, "d1", "new")
+        fake_redis.get_gate.set()
+
+        assert await pending == "old"
+        fake_redis.get_gate = None
+        # Kết quả cũ không được ghi vào L1 đè lên giá trị mới
+        assert await manager.get(CacheType.DEVICE, "d1") == "new"
+
+    async def test_cancelled_waiter_does_not_cancel_shared_fetch(
+        self, manager, fake_redis
+    ):
+        fake_redis.put("device:d1", "value")
+        fake_redis.get_gate = asyncio.Event()
+
+        first = asyncio.ensure_future(manager.get(CacheType.DEVICE, "d1"))
+        second = asyncio.ensure_future(manager.get(CacheType.DEVICE, "d1"))
+        await _wait_for_call(fake_redis, "get")
+        first.cancel()
+        await asyncio.sleep(0)
+        fake_redis.get_gate.set()
+
+        assert await second == "value"
+        assert first.cancelled()
+        assert fake_redis.calls.count("get") == 1
+
+
+@pytest.mark.unit
+class TestMget:
+    """mget returns values in request order with None for misses."""
+
+    async def test_mget_preserves_order_with_misses(self, manager, fake_redis):
+        fake_redis.put("location:ip1", "Hanoi")
+        fake_redis.put("weather:Hanoi", {"temp": 30})
+
+        values = await manager.mget(
+            [
+                (CacheType.WEATHER, "Hanoi"),
+                (CacheType.LOCATION, "missing"),
+                (CacheType.LOCATION, "ip1"),
+            ]
+        )
+
+        assert values == [{"temp": 30}, None, "Hanoi"]
+        assert fake_redis.calls.count("mget") == 1
+
+    async def test_mget_serves_l1_hits_without_redis(self, manager, fake_redis):
+        fake_redis.put("location:ip1", "Hanoi")
+        assert await manager.get(CacheType.LOCATION, "ip1") == "Hanoi"
+
+        values = await manager.mget([(CacheType.LOCATION, "ip1")])
+
+        assert values == ["Hanoi"]
+        assert "mget" not in fake_redis.calls
@@ -0,0 +1,52 @@
+"""
+Unit tests for decoding audio to 16 kHz mono PCM (PyAV path vs pydub path).
+"""
+
+import sys
+import wave
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app.ai.utils import util
+
+
+def _make_wav(path: Path, channels: int, rate: int = 16000, seconds: float = 0.5):
+    """Ghi một tệp WAV 16-bit ngắn (sóng sin 440 Hz, các kênh giống nhau)"""
+    t = np.arange(int(rate * seconds)) / rate
+    mono = (np.sin(2 * np.pi * 440 * t) * 12000).astype("<i2")
+    samples = np.repeat(mono[:, None], channels, axis=1)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return mono
+
+
+def _decode(path: Path) -> np.ndarray:
+    return np.frombuffer(b"".join(util._iter_pcm16k(str(path), "wav")), dtype="<i2")
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(util.av is None, reason="PyAV is not installed")
+class TestIterPcm16k:
+    """PyAV and pydub must produce the same 16 kHz mono 16-bit PCM."""
+
+    @pytest.mark.parametrize("channels", [1, 2])
+    def test_pyav_matches_pydub(self, tmp_path, monkeypatch, channels):
+        wav_path = tmp_path / "tone.wav"
+        expected = _make_wav(wav_path, channels)
+
+        pyav_pcm = _decode(wav_path)
+        monkeypatch.setattr(util, "av", None)
+        pydub_pcm = _decode(wav_path)
+
+        assert len(pyav_pcm) == len(pydub_pcm) == len(expected)
+        # Cho phép lệch 1 đơn vị do cách làm tròn khi trộn kênh khác nhau
+        assert np.abs(pyav_pcm.astype(np.int32) - pydub_pcm).max() <= 1
+        assert np.abs(pydub_pcm.astype(np.int32) - expected).max() <= 1
@@ -0,0 +1,72 @@
+"""
+Unit tests for GlobalCacheManager invalidation.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app.ai.utils.cache.config import CacheType
+from app.ai.utils.cache.manager import GlobalCacheManager
+
+
+KEYS = ["user1:a", "user10:b", "xuser1", "other:c"]
+
+
+def _make_manager() -> GlobalCacheManager:
+    manager = GlobalCacheManager()
+    for key in KEYS:
+        manager.set(CacheType.DEVICE_PROMPT, key, key)
+    return manager
+
+
+class TestInvalidatePattern:
+    """invalidate_pattern deletes every key containing the pattern as a substring."""
+
+    def test_deletes_all_substring_matches(self):
+        manager = _make_manager()
+
+        deleted = manager.invalidate_pattern(CacheType.DEVICE_PROMPT, "user1")
+
+        assert deleted == 3
+        for key in ("user1:a", "user10:b", "xuser1"):
+            assert manager.get(CacheType.DEVICE_PROMPT, key) is None
+        assert manager.get(CacheType.DEVICE_PROMPT, "other:c") == "other:c"
+
+    def test_partial_token_pattern(self):
+        manager = _make_manager()
+
+        deleted = manager.invalidate_pattern(CacheType.DEVICE_PROMPT, "ser1:")
+
+        assert deleted == 1
+        assert manager.get(CacheType.DEVICE_PROMPT, "user1:a") is None
+
+    def test_unknown_cache_returns_zero(self):
+        manager = GlobalCacheManager()
+
+        assert manager.invalidate_pattern(CacheType.DEVICE_PROMPT, "user1") == 0
+
+
+class TestExpiryHeap:
+    """The expiry heap stays bounded even when cleanup never runs for a cache."""
+
+    def test_overwrites_do_not_grow_heap(self):
+        manager = GlobalCacheManager()
+        cache_name = manager._get_cache_name(CacheType.DEVICE_PROMPT)
+
+        for i in range(10_000):
+            manager.set(CacheType.DEVICE_PROMPT, "same", i, ttl=60)
+
+        assert len(manager._heaps[cache_name]) <= 2 * 1 + 64 + 1
+        assert manager.get(CacheType.DEVICE_PROMPT, "same") == 9_999
+
+    def test_evicted_keys_do_not_grow_heap(self):
+        manager = GlobalCacheManager()
+        cache_name = manager._get_cache_name(CacheType.DEVICE_PROMPT)
+
+        for i in range(10_000):
+            manager.set(CacheType.DEVICE_PROMPT, f"k{i}", i, ttl=60)
+
+        cache_size = len(manager._caches[cache_name])
+        assert len(manager._heaps[cache_name]) <= 2 * cache_size + 64 + 1